@@ -0,0 +1,126 @@
+"""
+    Message corpora for the benchmarks
+"""
+
+import json
+import random
+import string
+from pathlib import Path
+from typing import Dict, List
+
+CORPORA_DIR = Path(__file__).parent / "corpora"
+
+# Emoji names the benchmark guilds have, see `run.FakeBot`
+EMOJI_NAMES = [
+    "kekw", "pepe_dance", "catjam", "blobwave", "thonk",
+    "pog", "sadge", "monkaS", "ez", "hype"
+]
+
+VOCABULARY = 5000
+SEED = 0
+
+
+def _vocabulary(rng: random.Random) -> List[str]:
+    """
+    Create random words
+
+    Args:
+        rng (random.Random): Random number generator
+
+    Returns:
+        List[str]: Words
+    """
+
+    return [
+        "".join(
+            rng.choice(string.ascii_lowercase)
+            for _ in range(rng.randint(1, 10))
+        )
+        for _ in range(VOCABULARY)
+    ]
+
+
+def synthetic(
+    count: int,
+    min_words: int,
+    max_words: int,
+    emoji_density: float = 0.0,
+    code_density: float = 0.0,
+    seed: int = SEED
+) -> List[str]:
+    """
+    Create chat-like messages with words drawn from a random vocabulary
+    with a Zipf distribution like natural language
+
+    Args:
+        count (int): Number of messages
+        min_words (int): Min words per message
+        max_words (int): Max words per message
+        emoji_density (float, optional): Chance of a word being a
+                                         `:name:` emoji. Defaults to 0.
+        code_density (float, optional): Chance of a message having an
+                                        inline code span and a code
+                                        block. Defaults to 0.
+        seed (int, optional): Random seed. Defaults to SEED.
+
+    Returns:
+        List[str]: Messages
+    """
+
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng)
+    weights = [1 / rank for rank in range(1, VOCABULARY + 1)]
+
+    messages = []
+    for _ in range(count):
+        words = rng.choices(
+            vocabulary, weights, k=rng.randint(min_words, max_words)
+        )
+
+        for i in range(len(words)):
+            if rng.random() < emoji_density:
+                words[i] = f":{rng.choice(EMOJI_NAMES)}:"
+
+        if rng.random() < code_density:
+            words.insert(rng.randint(0, len(words)), "`:kekw: x::y`")
+            words.append("```py\nprint(':pog:')\n```")
+
+        messages.append(" ".join(words))
+
+    return messages
+
+
+def recorded(name: str) -> List[str]:
+    """
+    Load a recorded corpus, one JSON-encoded message per line
+
+    Args:
+        name (str): File name in `benchmarks/corpora` without `.jsonl`
+
+    Returns:
+        List[str]: Messages
+    """
+
+    with open(CORPORA_DIR / f"{name}.jsonl") as FILE:
+        return [json.loads(line) for line in FILE if line.strip()]
+
+
+def load_corpora() -> Dict[str, List[str]]:
+    """
+    Get every corpus the suite runs on
+
+    Returns:
+        Dict[str, List[str]]: Corpus name => messages
+    """
+
+    corpora = {
+        "short": synthetic(2000, 1, 8),
+        "long": synthetic(200, 100, 300),
+        "emoji": synthetic(2000, 1, 20, emoji_density=0.3),
+        "code": synthetic(1000, 5, 40, emoji_density=0.1, code_density=0.5),
+    }
+
+    for path in sorted(CORPORA_DIR.glob("*.jsonl")):
+        corpora[path.stem] = recorded(path.stem)
+
+    return corpora
@@ -0,0 +1,41 @@
+"""
+    Per-message latency of Filter.scan with fuzzy matching off and on.
+
+    Run from the repository root:
+        python -m benchmarks.filter_fuzzy
+"""
+
+import time
+
+from src.utils.filter import Filter
+
+from .corpus import synthetic
+
+
+def main() -> None:
+    """
+        Main
+    """
+
+    text_filter = Filter()
+    messages = synthetic(2000, 1, 40)
+
+    for distance in range(3):
+        filter_config = {"fuzzy": distance}
+
+        # Build the lazy indexes outside the timed loop
+        text_filter.scan("warm up", 0, filter_config)
+
+        start = time.perf_counter()
+        for message in messages:
+            text_filter.scan(message, 0, filter_config)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"fuzzy={distance}: "
+            f"{elapsed / len(messages) * 1e6:.1f} us/message"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+    Per-message cost of the filter and AEWN.
+
+    Run from the repository root:
+        python -m benchmarks.run             Compare with the baseline
+        python -m benchmarks.run --save      Record a new baseline
+
+    Exits with 1 if the score of any benchmark dropped by more than
+    --threshold percent from the baseline. The score is throughput
+    relative to a fixed reference workload timed right before each
+    pass, so it compares across machines and load, unlike ops/sec.
+"""
+
+import gc
+import os
+import re
+import sys
+import json
+import time
+import statistics
+import asyncio
+import logging
+import argparse
+import inspect
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# The emoji module reads the env on import, and
+# unknown emojis are logged on every message
+os.environ.setdefault("REFLECT_GUILD_ID", "0")
+logging.disable(logging.ERROR)
+
+from src.utils.emoji import EmojiGroup  # noqa: E402
+from src.utils.filter import Filter  # noqa: E402
+
+from .corpus import EMOJI_NAMES, load_corpora  # noqa: E402
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+
+# Allowed score drop in percent
+DEFAULT_THRESHOLD = 15
+
+# Passes over each corpus, the median one counts
+DEFAULT_REPEAT = 11
+
+# Used by the reference workload
+_REFERENCE_PATTERN = re.compile(r"[^\w\s]+")
+
+# Guilds the fake bot is in and the guild messages are sent in
+GUILDS = 50
+GUILD_ID = 0
+
+
+class FakeEmoji:
+    """
+    The parts of discord.Emoji that EmojiGroup uses
+    """
+
+    def __init__(self, name: str, emoji_id: int, guild_id: int) -> None:
+        self.name = name
+        self.id = emoji_id
+        self.guild_id = guild_id
+        self.animated = True
+
+    def is_usable(self) -> bool:
+        return True
+
+    def __str__(self) -> str:
+        return f"<a:{self.name}:{self.id}>"
+
+
+class FakeBot:
+    """
+    The parts of discord.Bot that EmojiGroup uses, in GUILDS guilds
+    that share the same emoji names
+    """
+
+    def __init__(self) -> None:
+        self.emojis = [
+            FakeEmoji(name, guild_id * 1000 + i, guild_id)
+            for guild_id in range(GUILDS)
+            for i, name in enumerate(EMOJI_NAMES)
+        ]
+        self._by_id = {emoji.id: emoji for emoji in self.emojis}
+
+    def get_emoji(self, emoji_id: int) -> FakeEmoji:
+        return self._by_id.get(emoji_id)
+
+
+def reference(message: str) -> Any:
+    """
+    Fixed workload the benchmarks are scored against. It only uses
+    the standard library, so its speed changes with the machine and
+    its load but never with the code under test.
+
+    Args:
+        message (str): Message
+
+    Returns:
+        Any: Result, discarded
+    """
+
+    counts: Dict[str, int] = {}
+    for word in _REFERENCE_PATTERN.sub(" ", message.lower()).split():
+        counts[word] = counts.get(word, 0) + 1
+
+    return sorted(counts)
+
+
+def get_cases() -> Dict[str, Callable[[str], Any]]:
+    """
+    Get the functions to benchmark
+
+    Returns:
+        Dict[str, Callable[[str], Any]]: Name => function of a message
+    """
+
+    text_filter = Filter()
+    emoji_group = EmojiGroup(FakeBot())
+
+    return {
+        "filter.scan": text_filter.scan,
+        "filter.has_abusive_words": text_filter.has_abusive_words,
+        "filter.censor": text_filter.censor,
+        "emoji.process_emojis": lambda message: emoji_group.process_emojis(
+            message, GUILD_ID
+        ),
+        # Passes repeat the corpus, so also time the work the cache saves
+        "emoji.replace_emojis": lambda message: emoji_group._replace_emojis(
+            message, GUILD_ID
+        ),
+    }
+
+
+async def time_pass(
+    func: Callable[[str], Any],
+    messages: List[str],
+    latencies: List[int]
+) -> int:
+    """
+    Time one pass of a function over every message
+
+    Args:
+        func (Callable[[str], Any]): Function, may be async
+        messages (List[str]): Corpus
+        latencies (List[int]): Latency of each call is appended here
+
+    Returns:
+        int: Elapsed nanoseconds
+    """
+
+    elapsed = 0
+    for message in messages:
+        start = time.perf_counter_ns()
+
+        result = func(message)
+        if inspect.isawaitable(result):
+            await result
+
+        latency = time.perf_counter_ns() - start
+        latencies.append(latency)
+        elapsed += latency
+
+    return elapsed
+
+
+async def measure(
+    func: Callable[[str], Any],
+    messages: List[str],
+    repeat: int
+) -> Dict[str, float]:
+    """
+    Time a function on every message
+
+    Args:
+        func (Callable[[str], Any]): Function, may be async
+        messages (List[str]): Corpus
+        repeat (int): Passes over the corpus
+
+    Returns:
+        Dict[str, float]: ops/sec of the median pass, p50/p99 latency
+                          in microseconds and the score, the median
+                          throughput relative to the reference
+    """
+
+    latencies = []
+    passes = []
+    scores = []
+
+    # Collections would land on random messages
+    gc.collect()
+    gc.disable()
+
+    for _ in range(repeat):
+        # Back to back, so both see the same machine load
+        reference_elapsed = await time_pass(reference, messages, [])
+        elapsed = await time_pass(func, messages, latencies)
+
+        passes.append(elapsed)
+        scores.append(reference_elapsed / elapsed)
+
+    gc.enable()
+
+    latencies.sort()
+    return {
+        "ops_per_sec": round(
+            len(messages) / (statistics.median(passes) / 1e9), 1
+        ),
+        "p50_us": round(latencies[len(latencies) // 2] / 1e3, 2),
+        "p99_us": round(latencies[len(latencies) * 99 // 100] / 1e3, 2),
+        "score": round(statistics.median(scores), 4),
+    }
+
+
+async def run(repeat: int, selected: str) -> Dict[str, Dict[str, float]]:
+    """
+    Run every benchmark on every corpus
+
+    Args:
+        repeat (int): Passes over each corpus
+        selected (str): Only run benchmarks whose name contains this
+
+    Returns:
+        Dict[str, Dict[str, float]]: "case/corpus" => results
+    """
+
+    corpora = load_corpora()
+    results = {}
+
+    for case, func in get_cases().items():
+        if selected not in case:
+            continue
+
+        for corpus, messages in corpora.items():
+            # Warm up lazily built indexes and caches
+            await measure(func, messages[:10], 1)
+            results[f"{case}/{corpus}"] = await measure(
+                func, messages, repeat
+            )
+
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float
+) -> List[str]:
+    """
+    Print the results next to the baseline
+
+    Args:
+        results (dict): New results
+        baseline (dict): Baseline results
+        threshold (float): Allowed score drop in percent
+
+    Returns:
+        List[str]: Names of the regressed benchmarks
+    """
+
+    regressions = []
+
+    print(
+        f"{'benchmark':<40} {'ops/sec':>12} {'p50 us':>10} "
+        f"{'p99 us':>10} {'score':>8} {'change':>8}"
+    )
+    for name, result in results.items():
+        change = ""
+        if name in baseline:
+            ratio = result["score"] / baseline[name]["score"]
+            change = f"{(ratio - 1) * 100:+.1f}%"
+
+            if ratio < 1 - threshold / 100:
+                regressions.append(name)
+                change += " !"
+
+        print(
+            f"{name:<40} {result['ops_per_sec']:>12,.1f} "
+            f"{result['p50_us']:>10.2f} {result['p99_us']:>10.2f} "
+            f"{result['score']:>8.3f} {change:>8}"
+        )
+
+    return regressions
+
+
+def main() -> None:
+    """
+        Main
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="record the results as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed score drop in percent"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="passes over each corpus"
+    )
+    parser.add_argument(
+        "--only",
+        default="",
+        help="only run benchmarks whose name contains this"
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.repeat, args.only))
+
+    baseline = {}
+    if BASELINE_FILE.exists():
+        baseline = json.loads(BASELINE_FILE.read_text())
+
+    regressions = compare(results, baseline, args.threshold)
+
+    # Only scores are kept, ops/sec depend on the machine
+    if args.save:
+        baseline.update(
+            (name, {"score": result["score"]})
+            for name, result in results.items()
+        )
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=4) + "\n")
+        print(f"Saved baseline to {BASELINE_FILE}")
+        return
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than "
+              f"{args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
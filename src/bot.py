@@ -1,4 +1,5 @@
 import asyncio
+from codecs import getincrementaldecoder
 from io import StringIO
 import logging
 import pprint
@@ -6,9 +7,12 @@ from random import choice
 from datetime import datetime
 import re
 import sys
-from typing import List
+from typing import AsyncIterator, List, Optional
+
+from aiohttp import ClientError, ClientSession
 
 from discord import (
+    Attachment,
     Bot,
     Colour,
     Game,
@@ -29,13 +33,13 @@ from discord import (
 
 from .utils.db import get_database
 from .utils.youtube import YouTube
-from .utils.filter import Filter
+from .utils.filter import Filter, Match, embed_text
 from .utils.color import Colors
 from .utils.emoji import EmojiGroup
 from .utils.bump_timer import BumpTimer
 from .utils.env import (
     REFLECT_GUILD_ID,
-    MONGO_DB_URI
+    STORAGE_BACKEND
 )
 from .utils.constants import (
     ICODIAN_ROLE_ID,
@@ -48,6 +52,9 @@ from .utils.constants import (
     GENERAL_CHAT_CHANNEL_ID,
     SERVER_RULES_CHANNEL_ID,
     DISBOARD_ID,
+    FILTER_ATTACHMENT_CHUNK_SIZE,
+    FILTER_ATTACHMENT_EXTENSIONS,
+    FILTER_ATTACHMENT_MAX_SIZE,
 )
 
 
@@ -80,17 +87,30 @@ class Reflect(Bot):
         logging.info(msg="Initializing EmojiGroup")
         self.emoji_group = EmojiGroup(self)
 
-        # Create Filter instance
-        logging.info(msg="Initializing Filter")
-        self.filter = Filter()
+        # Create Filter instance and reload it when the word list changes
+        if not hasattr(self, "filter"):
+            logging.info(msg="Initializing Filter")
+            self.filter = Filter()
+            self.loop.create_task(self.filter.watch())
+
+        # HTTP session for downloading attachments
+        if not hasattr(self, "session"):
+            self.session = ClientSession()
 
         # Create YouTube instance
         logging.info("Initializing YouTube API")
         self.youtube = YouTube()
 
-        # Get database
-        logging.info("Getting database")
-        self.db = get_database(MONGO_DB_URI)
+        # Get database and keep its cache in sync with other processes
+        if not hasattr(self, "db"):
+            logging.info("Getting database")
+            self.db = get_database(STORAGE_BACKEND)
+            await self.db.ensure_indexes()
+            self.loop.create_task(self.db.watch())
+
+        # Fill guild config cache
+        logging.info("Caching guild configs")
+        await self.db.load()
 
         # Create BumpTimer instance
         logging.info(msg="Initializing BumpTimer")
@@ -101,7 +121,7 @@ class Reflect(Bot):
             logging.warning("Couldn't find iCODE")
 
         # Start bump timer
-        for guild_data in self.db.find():
+        for guild_data in self.db.get_guild_configs():
             logging.info(
                 f"Getting previous bump time for {guild_data['guild_id']}"
             )
@@ -134,6 +154,24 @@ class Reflect(Bot):
             # Set Online (activity)
             await self.change_presence(activity=Game(name="UMF 2023"))
 
+    async def close(self) -> None:
+        """
+        Flush deferred database writes, close the connections
+        and stop the filter workers before logging out
+        """
+
+        if hasattr(self, "db"):
+            logging.info("Closing database")
+            await self.db.close()
+
+        if hasattr(self, "filter"):
+            self.filter.close()
+
+        if hasattr(self, "session"):
+            await self.session.close()
+
+        await super().close()
+
     async def on_maintenance(self, ctx: ApplicationContext) -> None:
         """
         Called when a member runs a command in maintenance mode
@@ -186,25 +224,17 @@ class Reflect(Bot):
             payload (RawReactionActionEvent)
         """
 
-        try:
-            guild: Guild = self.get_guild(payload.guild_id)
-            guild_data = self.db.find_one({"guild_id": guild.id})
-            rxn_messages = guild_data["reaction_messages"]
-
-        except (KeyError, TypeError):
-            return
-
-        for rxn_msg in rxn_messages:
-            if int(rxn_msg) == payload.message_id:
-                break
-        else:
+        # Ignore messages without reaction roles
+        reaction_roles = self.db.get_reaction_roles(payload.message_id)
+        if not reaction_roles:
             return
 
         emoji: PartialEmoji = payload.emoji
+        guild: Guild = self.get_guild(payload.guild_id)
 
         try:
-            role: Role = guild.get_role(rxn_messages[rxn_msg][emoji.name])
-        except KeyError:
+            role: Role = guild.get_role(reaction_roles[emoji.name])
+        except (KeyError, AttributeError):
             pass
         else:
             if role:
@@ -221,25 +251,17 @@ class Reflect(Bot):
         Args:
             payload (RawReactionActionEvent)
         """
-        try:
-            guild: Guild = self.get_guild(payload.guild_id)
-            guild_data = self.db.find_one({"guild_id": guild.id})
-            rxn_messages = guild_data["reaction_messages"]
-
-        except (KeyError, TypeError):
-            return
-
-        for rxn_msg in rxn_messages:
-            if int(rxn_msg) == payload.message_id:
-                break
-        else:
+        # Ignore messages without reaction roles
+        reaction_roles = self.db.get_reaction_roles(payload.message_id)
+        if not reaction_roles:
             return
 
         emoji: PartialEmoji = payload.emoji
+        guild: Guild = self.get_guild(payload.guild_id)
 
         try:
-            role: Role = guild.get_role(rxn_messages[rxn_msg][emoji.name])
-        except KeyError:
+            role: Role = guild.get_role(reaction_roles[emoji.name])
+        except (KeyError, AttributeError):
             pass
         else:
             member: Member = await guild.fetch_member(payload.user_id)
@@ -268,7 +290,9 @@ class Reflect(Bot):
 
         # Set up required channels
         try:
-            guild_data = self.db.find_one({"guild_id": member.guild.id})
+            guild_data = await self.db.get_guild_config(
+                member.guild.id, "channel_ids.console_channel"
+            )
             channel = self.get_channel(
                 guild_data["channel_ids"]["console_channel"]
             )
@@ -330,7 +354,9 @@ class Reflect(Bot):
 
         # Set up required channels
         try:
-            guild_data = self.db.find_one({"guild_id": member.guild.id})
+            guild_data = await self.db.get_guild_config(
+                member.guild.id, "channel_ids.console_channel"
+            )
             channel = self.get_channel(
                 guild_data["channel_ids"]["console_channel"]
             )
@@ -439,6 +465,22 @@ class Reflect(Bot):
                     await self._run_code(after, prev=msg)
                     return
 
+            return
+
+        # Ignore webhooks, e.g. AEWN and censored messages
+        if after.webhook_id or not after.guild:
+            return
+
+        # Check the edited part for profanity words
+        matches = self.filter.scan_edit(
+            before.content,
+            after.content,
+            after.guild.id,
+            await self._get_filter_config(after.guild.id)
+        )
+        if matches:
+            await self._censor_message(after, matches)
+
     async def on_message_delete(self, message: Message) -> None:
         """
         Called when a message gets deleted
@@ -456,7 +498,9 @@ class Reflect(Bot):
 
         # Get staff channel
         try:
-            guild_data = self.db.find_one({"guild_id": message.guild.id})
+            guild_data = await self.db.get_guild_config(
+                message.guild.id, "channel_ids.modlogs_channel"
+            )
             channel = self.get_channel(
                 guild_data["channel_ids"]["modlogs_channel"]
             )
@@ -536,7 +580,7 @@ class Reflect(Bot):
                 logging.info("Updating bump time")
 
                 try:
-                    self.bump_timer.update_bump_time(
+                    await self.bump_timer.update_bump_time(
                         self.db, message.guild.id, datetime.utcnow()
                     )
                 except TypeError:
@@ -552,23 +596,150 @@ class Reflect(Bot):
                         delete_after=5
                     )
                 else:
-                    guild_data = self.db.find_one(
-                        {"guild_id": message.guild.id}
+                    guild_data = await self.db.get_guild_config(
+                        message.guild.id,
+                        "guild_id",
+                        "channel_ids.bump_reminder_channel",
+                        "role_ids.server_bumper_role"
                     )
                     self.dispatch("bump_timer_done", guild_data, 7200)
             return
 
+        # AEWN and the filter only work in guilds
+        if not message.guild:
+            return
+
         # AEWN: Animated Emojis Without Nitro
-        if message.content.count(":") > 1 and not message.webhook_id:
+        if not message.webhook_id \
+                and self.emoji_group.has_emojis(message.content):
             await self._animated_emojis(message)
 
-        # Check for profanity words
-        if self.filter.has_abusive_words(message.content):
-            await self._send_webhook(
-                message=message,
-                mod_msg=self.filter.censor(message.content),
-            )
-            await message.delete()
+        # Check for profanity words, with the guild's own word lists
+        filter_config = await self._get_filter_config(message.guild.id) or {}
+        matches = self.filter.scan(
+            message.content,
+            message.guild.id,
+            filter_config
+        )
+
+        # Check attachments and embeds too if the guild wants it
+        flagged = bool(matches) or (
+            filter_config.get("attachments", False)
+            and not message.webhook_id
+            and await self._has_abusive_attachments(message, filter_config)
+        )
+        if flagged:
+            await self._censor_message(message, matches)
+
+    async def _get_filter_config(self, guild_id: int) -> Optional[dict]:
+        """
+        Get the filter settings of a guild
+
+        Args:
+            guild_id (int): Guild ID
+
+        Returns:
+            Optional[dict]: Word lists and fuzziness, None if not set
+        """
+
+        guild_data = await self.db.get_guild_config(guild_id, "filter")
+        return (guild_data or {}).get("filter")
+
+    async def _censor_message(
+        self,
+        message: Message,
+        matches: List[Match]
+    ) -> None:
+        """
+        Repost a message with its bad words censored and delete it.
+        Attachments and embeds aren't reposted.
+
+        Args:
+            message (Message): Message with bad words
+            matches (List[Match]): Bad words found by the filter
+                                   in its content
+        """
+
+        await self._send_webhook(
+            message=message,
+            mod_msg=self.filter.censor(message.content, matches)
+            or "*Attachment removed by the text filter*",
+        )
+        await message.delete()
+
+    async def _has_abusive_attachments(
+        self,
+        message: Message,
+        filter_config: dict
+    ) -> bool:
+        """
+        Check the text attachments and embeds of a message
+        for profanity words
+
+        Args:
+            message (Message): Message
+            filter_config (dict): The guild's filter settings
+
+        Returns:
+            bool: True if any of them has a bad word
+        """
+
+        for embed in message.embeds:
+            if self.filter.scan(
+                embed_text(embed), message.guild.id, filter_config
+            ):
+                return True
+
+        for attachment in message.attachments:
+            if not attachment.filename.lower().endswith(
+                FILTER_ATTACHMENT_EXTENSIONS
+            ):
+                continue
+
+            try:
+                if await self.filter.scan_stream(
+                    self._read_attachment(attachment),
+                    message.guild.id,
+                    filter_config
+                ):
+                    return True
+
+            except ClientError as e:
+                logging.warning(f"Couldn't read {attachment.filename}: {e}")
+
+        return False
+
+    async def _read_attachment(
+        self,
+        attachment: Attachment
+    ) -> AsyncIterator[str]:
+        """
+        Download the start of a text attachment in chunks
+
+        Args:
+            attachment (Attachment): Attachment
+
+        Yields:
+            str: Decoded chunks, FILTER_ATTACHMENT_MAX_SIZE bytes at most
+        """
+
+        decoder = getincrementaldecoder("utf-8")(errors="replace")
+        remaining = FILTER_ATTACHMENT_MAX_SIZE
+
+        async with self.session.get(attachment.url) as response:
+            response.raise_for_status()
+
+            async for chunk in response.content.iter_chunked(
+                FILTER_ATTACHMENT_CHUNK_SIZE
+            ):
+                chunk = chunk[:remaining]
+                remaining -= len(chunk)
+                yield decoder.decode(chunk)
+
+                if not remaining:
+                    break
+
+        yield decoder.decode(b"", final=True)
 
     async def _run_code(self, message: Message, prev: Message = None) -> None:
         """Run code
@@ -0,0 +1,108 @@
+from typing import List
+
+from discord import (
+    Cog,
+    Embed,
+    Option,
+    SlashCommandGroup,
+    ApplicationContext,
+    AutocompleteContext
+)
+
+from ..bot import Reflect
+from ..utils.color import Colors
+from ..utils.checks import (
+    maintenance_check
+)
+
+
+async def _complete_aliases(ctx: AutocompleteContext) -> List[str]:
+    """
+    Suggest the aliases starting with what the user typed
+
+    Args:
+        ctx (AutocompleteContext)
+
+    Returns:
+        List[str]: Aliases
+    """
+
+    return ctx.bot.emoji_group.search(ctx.value or "")
+
+
+class EmojiCommands(Cog):
+    """
+    Commands for the emojis of AEWN
+    """
+
+    # Create command group
+    EMOJI = SlashCommandGroup(
+        "emoji",
+        "Commands for emojis."
+    )
+
+    def __init__(self, bot: Reflect) -> None:
+        """
+        Initialize
+
+        Args:
+            bot (discord.Bot): iCODE-BOT
+        """
+
+        super().__init__()
+        self._bot = bot
+
+    @EMOJI.command(name="search")
+    @maintenance_check()
+    async def _search(
+        self,
+        ctx: ApplicationContext,
+        name: Option(
+            str,
+            "Name of the emoji",
+            autocomplete=_complete_aliases
+        )
+    ) -> None:
+        """
+        Find an emoji by name
+
+        Args:
+            ctx (ApplicationContext)
+            name (str): Emoji name
+        """
+
+        name = name.strip(": ")
+
+        try:
+            emoji = self._bot.emoji_group.get_emoji(name, ctx.guild_id)
+        except AttributeError:
+            emoji = None
+
+        # Suggest the names starting with it
+        if not emoji:
+            aliases = self._bot.emoji_group.search(name)
+            emoji = self._bot.emoji_group.get_emoji("red_cross")
+            description = f"{emoji} No emoji named `:{name}:`"
+
+            if aliases:
+                description += "\nDid you mean " + ", ".join(
+                    f"`:{alias}:`" for alias in aliases
+                )
+
+            await ctx.respond(
+                embed=Embed(
+                    description=description,
+                    color=Colors.RED
+                ),
+                ephemeral=True
+            )
+            return
+
+        await ctx.respond(
+            embed=Embed(
+                description=f"{emoji} • `:{name}:`",
+                color=Colors.GOLD
+            ).set_thumbnail(
+                url=emoji.url
+            )
+        )
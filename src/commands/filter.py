@@ -0,0 +1,283 @@
+from typing import List, Optional, Tuple
+
+from discord import (
+    Cog,
+    Embed,
+    Interaction,
+    Option,
+    SlashCommandGroup,
+    ApplicationContext
+)
+
+from ..bot import Reflect
+from ..utils.color import Colors
+from ..utils.constants import FILTER_FUZZY_MAX_DISTANCE
+from ..utils.checks import (
+    maintenance_check,
+    permission_check
+)
+
+
+class FilterCommands(Cog):
+    """
+    Commands for the guild's text filter
+    """
+
+    # Create command group
+    FILTER = SlashCommandGroup(
+        "filter",
+        "Commands for the text filter."
+    )
+
+    def __init__(self, bot: Reflect) -> None:
+        """
+        Initialize
+
+        Args:
+            bot (discord.Bot): iCODE-BOT
+        """
+
+        super().__init__()
+        self._bot = bot
+
+    @FILTER.command(name="allow")
+    @maintenance_check()
+    @permission_check(administrator=True)
+    async def _allow(
+        self,
+        ctx: ApplicationContext,
+        word: Option(str, "Word the filter should ignore")
+    ) -> None:
+        """
+        Stop filtering a word in this server
+
+        Args:
+            ctx (ApplicationContext)
+            word (str): The word
+        """
+
+        word = word.strip().lower()
+        await self._update_lists(ctx, word, "allow", f"`{word}` is allowed")
+
+    @FILTER.command(name="deny")
+    @maintenance_check()
+    @permission_check(administrator=True)
+    async def _deny(
+        self,
+        ctx: ApplicationContext,
+        word: Option(str, "Word the filter should remove")
+    ) -> None:
+        """
+        Filter a word in this server
+
+        Args:
+            ctx (ApplicationContext)
+            word (str): The word
+        """
+
+        word = word.strip().lower()
+        await self._update_lists(ctx, word, "deny", f"`{word}` is denied")
+
+    @FILTER.command(name="reset")
+    @maintenance_check()
+    @permission_check(administrator=True)
+    async def _reset(
+        self,
+        ctx: ApplicationContext,
+        word: Option(str, "Word to remove from the lists")
+    ) -> None:
+        """
+        Use the default filter setting for a word
+
+        Args:
+            ctx (ApplicationContext)
+            word (str): The word
+        """
+
+        word = word.strip().lower()
+        await self._update_lists(
+            ctx, word, None, f"`{word}` uses the default filter"
+        )
+
+    @FILTER.command(name="fuzzy")
+    @maintenance_check()
+    @permission_check(administrator=True)
+    async def _fuzzy(
+        self,
+        ctx: ApplicationContext,
+        distance: Option(
+            int,
+            "Number of typos a word can be away from a bad word. "
+            "0 turns fuzzy matching off",
+            min_value=0,
+            max_value=FILTER_FUZZY_MAX_DISTANCE
+        )
+    ) -> None:
+        """
+        Also filter misspelled bad words in this server
+
+        Args:
+            ctx (ApplicationContext)
+            distance (int): Max edit distance
+        """
+
+        # Send animation embed
+        emoji = self._bot.emoji_group.get_emoji("loading_dots")
+        res: Interaction = await ctx.respond(
+            embed=Embed(
+                description=f"Updating fuzzy matching {emoji}",
+                color=Colors.GOLD
+            ),
+            ephemeral=True
+        )
+
+        # Update guild document
+        await self._bot.db.set_filter_fuzziness(ctx.guild.id, distance)
+
+        # Prompt success and warn about words that look like bad words
+        emoji = self._bot.emoji_group.get_emoji("green_tick")
+        description = f"Fuzzy matching set to {distance} typo(s) {emoji}"
+        if distance:
+            description += (
+                "\nSome everyday words a typo away from a bad word, "
+                "e.g. \"batches\", \"packer\" or \"regard\", are "
+                "filtered too. Allow them with `/filter allow`."
+            )
+
+        await res.edit_original_response(
+            embed=Embed(
+                description=description,
+                color=Colors.GREEN
+            )
+        )
+
+    @FILTER.command(name="attachments")
+    @maintenance_check()
+    @permission_check(administrator=True)
+    async def _attachments(
+        self,
+        ctx: ApplicationContext,
+        enabled: Option(bool, "Also check text files and embeds")
+    ) -> None:
+        """
+        Turn the filter on or off for text attachments and embeds
+
+        Args:
+            ctx (ApplicationContext)
+            enabled (bool): Scan attachments and embeds
+        """
+
+        # Send animation embed
+        emoji = self._bot.emoji_group.get_emoji("loading_dots")
+        res: Interaction = await ctx.respond(
+            embed=Embed(
+                description=f"Updating attachment filtering {emoji}",
+                color=Colors.GOLD
+            ),
+            ephemeral=True
+        )
+
+        # Update guild document
+        await self._bot.db.set_filter_attachments(ctx.guild.id, enabled)
+
+        # Prompt success
+        emoji = self._bot.emoji_group.get_emoji("green_tick")
+        state = "enabled" if enabled else "disabled"
+        await res.edit_original_response(
+            embed=Embed(
+                description=f"Attachment filtering {state} {emoji}",
+                color=Colors.GREEN
+            )
+        )
+
+    @FILTER.command(name="list")
+    @maintenance_check()
+    @permission_check(administrator=True)
+    async def _list(self, ctx: ApplicationContext) -> None:
+        """
+        Show the filter word lists of this server
+
+        Args:
+            ctx (ApplicationContext)
+        """
+
+        allow, deny = await self._get_lists(ctx.guild.id)
+
+        await ctx.respond(
+            embed=Embed(
+                title="Filter word lists",
+                color=Colors.GOLD
+            ).add_field(
+                name="Allowed",
+                value=", ".join(f"||{word}||" for word in allow) or "None",
+                inline=False
+            ).add_field(
+                name="Denied",
+                value=", ".join(f"||{word}||" for word in deny) or "None",
+                inline=False
+            ),
+            ephemeral=True
+        )
+
+    async def _get_lists(self, guild_id: int) -> Tuple[List[str], List[str]]:
+        """
+        Get copies of a guild's allow and deny lists
+
+        Args:
+            guild_id (int): Guild ID
+
+        Returns:
+            Tuple[List[str], List[str]]: Allowed and denied words
+        """
+
+        guild_data = await self._bot.db.get_guild_config(
+            guild_id,
+            "filter.allow",
+            "filter.deny"
+        )
+        filter_config = (guild_data or {}).get("filter", {})
+
+        return (
+            list(filter_config.get("allow", [])),
+            list(filter_config.get("deny", []))
+        )
+
+    async def _update_lists(
+        self,
+        ctx: ApplicationContext,
+        word: str,
+        list_name: Optional[str],
+        success: str
+    ) -> None:
+        """
+        Move a word to a word list of the guild and prompt the result
+
+        Args:
+            ctx (ApplicationContext)
+            word (str): The word
+            list_name (Optional[str]): `allow`, `deny` or None for
+                                       neither
+            success (str): Success message
+        """
+
+        # Send animation embed
+        emoji = self._bot.emoji_group.get_emoji("loading_dots")
+        res: Interaction = await ctx.respond(
+            embed=Embed(
+                description=f"Updating filter word lists {emoji}",
+                color=Colors.GOLD
+            ),
+            ephemeral=True
+        )
+
+        # Update guild document
+        await self._bot.db.set_filter_word(ctx.guild.id, word, list_name)
+
+        # Prompt success
+        emoji = self._bot.emoji_group.get_emoji("green_tick")
+        await res.edit_original_response(
+            embed=Embed(
+                description=f"{success} {emoji}",
+                color=Colors.GREEN
+            )
+        )
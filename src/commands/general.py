@@ -1,7 +1,8 @@
 import logging
 from mediawiki import MediaWiki
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
+from cachetools import LRUCache
 
 from discord import (
     AllowedMentions,
@@ -31,6 +32,11 @@ from discord.ui import (
 
 from src.bot import Reflect
 from src.utils.color import Colors
+from src.utils.constants import (
+    EMOJI_COLUMNS,
+    EMOJIS_PER_COLUMN,
+    EMOJI_PAGES_CACHE_SIZE
+)
 from src.utils.checks import (
     maintenance_check
 )
@@ -153,22 +159,62 @@ class EmbedBuilder(Modal):
 
 class EmojiDisplay(View):
 
-    def __init__(self, bot: Reflect, ctx: ApplicationContext, embeds: List):
+    def __init__(
+        self,
+        bot: Reflect,
+        ctx: ApplicationContext,
+        pages: List[Tuple[str, ...]]
+    ):
         """
         Initialize
 
         Args:
             bot (ICodeBot)
-            videos (dict): Video dicts
+            ctx (ApplicationContext)
+            pages (List[Tuple[str, ...]]): Column texts of each page
         """
         super().__init__(timeout=360)
 
         # Set attributes
         self._bot = bot
         self.ctx = ctx
-        self.embeds = embeds
+        self.pages = pages
         self.cursor = 0
 
+    def get_embed(self) -> Embed:
+        """
+        Render the page at the cursor
+
+        Returns:
+            Embed: Page embed
+        """
+
+        embed = Embed(
+            color=Colors.GOLD,
+            timestamp=datetime.now()
+        ).set_author(
+            name=f"Reflect - Emojis",
+            icon_url=self._bot.user.avatar
+        ).set_footer(
+            text=self.ctx.author.display_name,
+            icon_url=self.ctx.author.display_avatar
+        ).set_thumbnail(
+            url=self._bot.user.display_avatar
+        )
+
+        if not self.pages:
+            embed.description = "No emojis"
+            return embed
+
+        for i, column in enumerate(self.pages[self.cursor], 1):
+            embed.add_field(
+                name=f"Column {i}",
+                value=column,
+                inline=True
+            )
+
+        return embed
+
     @button(
         label="<",
         style=ButtonStyle.primary
@@ -186,7 +232,7 @@ class EmojiDisplay(View):
             interaction (Interaction)
         """
 
-        # Return if the cursor is at first embed
+        # Return if the cursor is at first page
         if (self.cursor - 1) < 0:
             await interaction.response.defer()
             return
@@ -194,9 +240,9 @@ class EmojiDisplay(View):
         # Update cursor
         self.cursor -= 1
 
-        # Send video embeds
+        # Send page embed
         await interaction.response.edit_message(
-            embed=self.embeds[self.cursor]
+            embed=self.get_embed()
         )
 
     @button(
@@ -216,17 +262,17 @@ class EmojiDisplay(View):
             interaction (Interaction)
         """
 
-        # Return if the cursor is at last embed
-        if (self.cursor + 1) >= len(self.embeds):
+        # Return if the cursor is at last page
+        if (self.cursor + 1) >= len(self.pages):
             await interaction.response.defer()
             return
 
         # Update cursor
         self.cursor += 1
 
-        # Send video embeds
+        # Send page embed
         await interaction.response.edit_message(
-            embed=self.embeds[self.cursor]
+            embed=self.get_embed()
         )
 
 
@@ -245,6 +291,11 @@ class GeneralCommands(Cog):
         super().__init__()
         self._bot = bot
 
+        # (guild_id, emoji version) => column texts of the /emojis pages
+        self._emoji_pages: LRUCache = LRUCache(
+            maxsize=EMOJI_PAGES_CACHE_SIZE
+        )
+
     @slash_command(name="embed")
     @maintenance_check()
     async def _embed(
@@ -309,79 +360,50 @@ class GeneralCommands(Cog):
         Args:
             ctx (ApplicationContext)
         """
-        # Set up
-        emoji_dict = self._bot.emoji_group._emojis
-        guilds: List[int] = list(emoji_dict.keys())
-
-        try:
-            guilds.remove(ctx.guild_id)
-            guilds.insert(0, ctx.guild_id)
-        except ValueError:
-            pass
-
-        # Create a list of available emojis
-        temp = set()
-        emojis: List[str] = []
 
-        for guild_id in guilds:
-            guild_emojis = emoji_dict[guild_id]
-
-            for emoji_str in guild_emojis:
-                emoji = self._bot.emoji_group.get_emoji(emoji_str, guild_id)
-
-                if not emoji.is_usable():
-                    continue
-
-                if emoji_str in temp or \
-                        (emoji_str[-2] == "-" and emoji.id in temp):
-                    continue
-
-                # Update emojis
-                emojis.append(
-                    f"{emoji} "
-                    f"• `:{emoji_str}:`"
-                )
+        # Send the first page with a view obj
+        pages = self._get_emoji_pages(ctx.guild_id)
+        view = EmojiDisplay(self._bot, ctx, pages)
+        await ctx.respond(
+            embed=view.get_embed(),
+            view=view
+        )
 
-                # Update temp
-                temp.add(emoji_str)
-                temp.add(emoji.id)
+    def _get_emoji_pages(self, guild_id: int) -> List[Tuple[str, ...]]:
+        """
+        Get the column texts of the /emojis pages of a guild, built
+        once per guild until the emojis change
 
-        # To prevent IndexeError
-        emoji_count = len(emojis)
-        while emoji_count % 20 != 0:
-            emojis.append(".")
-            emoji_count += 1
+        Args:
+            guild_id (int): Guild ID
 
-        # Create embeds for emojis
-        embeds: List[Embed] = []
-        for i in range(0, len(emojis), 20):
-            embed = Embed(
-                color=Colors.GOLD,
-                timestamp=datetime.now()
-            ).set_author(
-                name=f"Reflect - Emojis",
-                icon_url=self._bot.user.avatar
-            ).set_footer(
-                text=ctx.author.display_name,
-                icon_url=ctx.author.display_avatar
-            ).set_thumbnail(
-                url=self._bot.user.display_avatar
-            ).add_field(
-                name="Column 1",
-                value="\n".join(emojis[i:i+10]),
-                inline=True
-            ).add_field(
-                name="Column 2",
-                value="\n".join(emojis[i+10:i+20])
-            )
+        Returns:
+            List[Tuple[str, ...]]: Column texts of each page
+        """
 
-            embeds.append(embed)
+        key = (guild_id, self._bot.emoji_group.version)
+        pages = self._emoji_pages.get(key)
+        if pages is not None:
+            return pages
 
-        # Send embed with a view obj
-        await ctx.respond(
-            embed=embeds[0],
-            view=EmojiDisplay(self._bot, ctx, embeds)
-        )
+        # Create a list of available emojis
+        emojis: List[str] = [
+            f"{emoji} • `:{alias}:`"
+            for alias, emoji in self._bot.emoji_group.usable_emojis(guild_id)
+        ]
+
+        # Join the columns of each page, the last one may be shorter
+        pages = []
+        page_size = EMOJIS_PER_COLUMN * EMOJI_COLUMNS
+        for i in range(0, len(emojis), page_size):
+            page = emojis[i:i + page_size]
+            pages.append(tuple(
+                "\n".join(page[j:j + EMOJIS_PER_COLUMN])
+                for j in range(0, len(page), EMOJIS_PER_COLUMN)
+            ))
+
+        self._emoji_pages[key] = pages
+        return pages
 
     @slash_command(name="wiki")
     @maintenance_check()
@@ -467,10 +489,11 @@ class GeneralCommands(Cog):
 
         # Try to get Suggestions channel
         try:
+            guild_data = await self._bot.db.get_guild_config(
+                ctx.guild.id, "channel_ids.suggestions_channel"
+            )
             channel = self._bot.get_channel(
-                self._bot.db.find_one(
-                    {"guild_id": ctx.guild.id}
-                )["channel_ids"]["suggestions_channel"]
+                guild_data["channel_ids"]["suggestions_channel"]
             )
             assert isinstance(channel, TextChannel)
 
@@ -95,3 +95,142 @@ class MiscellaneousCommands(Cog):
             delete_after=2
         )
         logging.info("Toggled maintenance mode")
+
+    @slash_command(name="explain-queries")
+    @permission_check(bot_owner=True)
+    async def _explain_queries(self, ctx: ApplicationContext) -> None:
+        """
+        Show the query plans of common database queries
+
+        Args:
+            ctx (ApplicationContext)
+        """
+
+        # Respond with an embed
+        emoji = self._bot.emoji_group.get_emoji("loading_dots")
+        res: Interaction = await ctx.respond(
+            embed=Embed(
+                description=f"Explaining queries {emoji}",
+                color=Colors.GOLD,
+            )
+        )
+
+        # Get winning plan of each query
+        plans = await self._bot.db.explain_queries()
+        collscan = any("COLLSCAN" in stages for stages in plans.values())
+
+        embed = Embed(
+            title="Query Plans",
+            color=Colors.RED if collscan else Colors.GREEN
+        )
+        for name, stages in plans.items():
+            embed.add_field(
+                name=name,
+                value=f"`{' <- '.join(stages)}`",
+                inline=False
+            )
+
+        await res.edit_original_response(embed=embed)
+
+    @slash_command(name="migrate-reaction-roles")
+    @permission_check(bot_owner=True)
+    async def _migrate_reaction_roles(self, ctx: ApplicationContext) -> None:
+        """
+        Move reaction roles out of guild documents
+
+        Args:
+            ctx (ApplicationContext)
+        """
+
+        # Respond with an embed
+        emoji = self._bot.emoji_group.get_emoji("loading_dots")
+        res: Interaction = await ctx.respond(
+            embed=Embed(
+                description=f"Migrating reaction roles {emoji}",
+                color=Colors.GOLD,
+            )
+        )
+
+        # Migrate
+        count = await self._bot.db.migrate_reaction_messages()
+        logging.info(f"Migrated {count} reaction message(s)")
+
+        # Prompt completion
+        emoji = self._bot.emoji_group.get_emoji("done")
+        await res.edit_original_response(
+            embed=Embed(
+                description=f"Migrated {count} reaction message(s) {emoji}",
+                color=Colors.GREEN
+            )
+        )
+
+    @slash_command(name="reload-filter")
+    @permission_check(bot_owner=True)
+    async def _reload_filter(self, ctx: ApplicationContext) -> None:
+        """
+        Reload the filter word list from its file
+
+        Args:
+            ctx (ApplicationContext)
+        """
+
+        # Respond with an embed
+        emoji = self._bot.emoji_group.get_emoji("loading_dots")
+        res: Interaction = await ctx.respond(
+            embed=Embed(
+                description=f"Reloading filter {emoji}",
+                color=Colors.GOLD,
+            )
+        )
+
+        # Reload, the current list stays in use if the file can't be read
+        if not await self._bot.filter.reload(force=True):
+            emoji = self._bot.emoji_group.get_emoji("red_cross")
+            await res.edit_original_response(
+                embed=Embed(
+                    description=f"{emoji} Couldn't read the word list, "
+                                "the current one is still used",
+                    color=Colors.RED
+                )
+            )
+            return
+
+        # Prompt completion
+        emoji = self._bot.emoji_group.get_emoji("done")
+        await res.edit_original_response(
+            embed=Embed(
+                description=f"Reloaded filter {emoji}",
+                color=Colors.GREEN
+            )
+        )
+
+    @slash_command(name="emoji-cache")
+    @permission_check(bot_owner=True)
+    async def _emoji_cache(self, ctx: ApplicationContext) -> None:
+        """
+        Show the usage of the processed message cache of AEWN
+
+        Args:
+            ctx (ApplicationContext)
+        """
+
+        info = self._bot.emoji_group.cache_info()
+        lookups = info.hits + info.misses
+        hit_rate = info.hits / lookups if lookups else 0
+
+        await ctx.respond(
+            embed=Embed(
+                title="Emoji Cache",
+                color=Colors.GOLD
+            ).add_field(
+                name="Hits",
+                value=f"{info.hits} ({hit_rate:.1%})"
+            ).add_field(
+                name="Misses",
+                value=str(info.misses)
+            ).add_field(
+                name="Size",
+                value=f"{info.size / 1024:.1f} KiB of "
+                      f"{info.max_size / 1024:.0f} KiB"
+            )
+        )
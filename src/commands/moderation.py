@@ -181,10 +181,11 @@ class ModerationCommands(Cog):
 
         # Try to get the modlogs channel
         try:
+            guild_data = await self._bot.db.get_guild_config(
+                ctx.guild.id, "channel_ids.modlogs_channel"
+            )
             channel = self._bot.get_channel(
-                self._bot.db.find_one(
-                    {"guild_id": ctx.guild.id}
-                )["channel_ids"]["modlogs_channel"]
+                guild_data["channel_ids"]["modlogs_channel"]
             )
             assert isinstance(channel, TextChannel)
 
@@ -258,10 +259,11 @@ class ModerationCommands(Cog):
 
         # Try to get modlogs channel
         try:
+            guild_data = await self._bot.db.get_guild_config(
+                ctx.guild.id, "channel_ids.modlogs_channel"
+            )
             channel = self._bot.get_channel(
-                self._bot.db.find_one(
-                    {"guild_id": ctx.guild.id}
-                )["channel_ids"]["modlogs_channel"]
+                guild_data["channel_ids"]["modlogs_channel"]
             )
             assert isinstance(channel, TextChannel)
 
@@ -351,10 +353,11 @@ class ModerationCommands(Cog):
 
         # Try to get the modlogs channel
         try:
+            guild_data = await self._bot.db.get_guild_config(
+                ctx.guild.id, "channel_ids.modlogs_channel"
+            )
             channel = self._bot.get_channel(
-                self._bot.db.find_one(
-                    {"guild_id": ctx.guild.id}
-                )["channel_ids"]["modlogs_channel"]
+                guild_data["channel_ids"]["modlogs_channel"]
             )
             assert isinstance(channel, TextChannel)
 
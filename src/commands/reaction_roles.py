@@ -101,6 +101,20 @@ class ReactionRoleCommands(Cog):
 
                 return
 
+        # Reaction roles are stored per message across guilds, so
+        # messages of other guilds can't be used
+        if not message.guild or message.guild.id != ctx.guild.id:
+            emoji = self._bot.emoji_group.get_emoji("red_cross")
+            await res.edit_original_response(
+                embed=Embed(
+                    title=f"Error fetching message {emoji}",
+                    description="The message must be in this server",
+                    color=Colors.RED
+                ),
+                delete_after=3
+            )
+            return
+
         # Determine msg reactions
         msg_reactions: List[Reaction] = message.reactions
 
@@ -164,40 +178,11 @@ class ReactionRoleCommands(Cog):
 
             rxn_data[reaction.emoji.name] = role.id
 
-        # Try to get the already existing reaction data
-        try:
-            rxn_messages = self._bot.db.find_one(
-                {"guild_id": ctx.guild.id}
-            )["reaction_messages"]
-
-            # Update data
-            rxn_messages[message_id] = rxn_data
-            self._bot.db.update_one(
-                self._bot.db.find_one(filter={"guild_id": ctx.guild.id}),
-                {
-                    "$set": {
-                        "reaction_messages": rxn_messages
-                    }
-                }
-            )
-
-        # If not successful
-        except KeyError:
-
-            # Create new reaction data
-            self._bot.db.update_one(
-                self._bot.db.find_one(filter={"guild_id": ctx.guild.id}),
-                {
-                    "$set": {
-                        "reaction_messages": {
-                            message_id: rxn_data
-                        }
-                    }
-                }
-            )
-
-        # Send msg to setup reaction roles
-        except TypeError:
+        # Set reaction data of the message
+        if not await self._bot.db.set_reaction_message(
+            ctx.guild.id, message.id, rxn_data
+        ):
+            # Send msg to setup reaction roles
             emoji = self._bot.emoji_group.get_emoji("warning")
             await res.edit_original_response(
                 embed=Embed(
@@ -246,36 +231,25 @@ class ReactionRoleCommands(Cog):
             )
         )
 
-        # Try to get the reaction data
+        # Validate the message ID
         try:
-            rxn_messages = self._bot.db.find_one(
-                {"guild_id": ctx.guild.id}
-            )["reaction_messages"]
-
-            # Remove the key equal to message id
-            rxn_messages.pop(message_id)
-            self._bot.db.update_one(
-                self._bot.db.find_one(filter={"guild_id": ctx.guild.id}),
-                {
-                    "$set": {
-                        "reaction_messages": rxn_messages
-                    }
-                }
-            )
-
-        # Create new reaction data if not already there
-        except KeyError:
-            self._bot.db.update_one(
-                self._bot.db.find_one(filter={"guild_id": ctx.guild.id}),
-                {
-                    "$set": {
-                        "reaction_messages": {}
-                    }
-                }
+            message_id = int(message_id)
+        except ValueError:
+            emoji = self._bot.emoji_group.get_emoji("red_cross")
+            await res.edit_original_response(
+                embed=Embed(
+                    description=f"{emoji} Invalid message ID `{message_id}`",
+                    color=Colors.RED
+                ),
+                delete_after=3
             )
+            return
 
-        # Send msg to setup reaction roles
-        except TypeError:
+        # Remove reaction data of the message
+        if not await self._bot.db.remove_reaction_message(
+            ctx.guild.id, message_id
+        ):
+            # Send msg to setup reaction roles
             emoji = self._bot.emoji_group.get_emoji("warning")
             await res.edit_original_response(
                 embed=Embed(
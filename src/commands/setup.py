@@ -71,51 +71,9 @@ class SetupCommands(Cog):
             )
         )
 
-        # Check if guild document is created
+        # Update guild document
         guild: Guild = ctx.guild
-        if not self._bot.db.find_one(filter={"guild_id": guild.id}):
-
-            # Create new document
-            self._bot.db.insert_one(
-                {
-                    "guild_id": guild.id,
-                    "channel_ids": {
-                        "modlogs_channel": channel.id
-                    }
-                }
-            )
-
-        # If it is
-        else:
-            # Try to get channel ids
-            try:
-                channel_ids = self._bot.db.find_one(
-                    {"guild_id": guild.id}
-                )["channel_ids"]
-
-                # Update channel ids
-                channel_ids["modlogs_channel"] = channel.id
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "channel_ids": channel_ids
-                        }
-                    }
-                )
-
-            # Create new channel ids key if it doesnot exist
-            except KeyError:
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "channel_ids": {
-                                "modlogs_channel": channel.id
-                            }
-                        }
-                    }
-                )
+        await self._bot.db.set_channel(guild.id, "modlogs_channel", channel.id)
 
         # Prompt success
         emoji = self._bot.emoji_group.get_emoji("green_tick")
@@ -162,52 +120,13 @@ class SetupCommands(Cog):
             )
         )
 
-        # Check if guild document is created
+        # Update guild document
         guild: Guild = ctx.guild
-        if not self._bot.db.find_one(filter={"guild_id": guild.id}):
-
-            # Create new document
-            self._bot.db.insert_one(
-                {
-                    "guild_id": guild.id,
-                    "channel_ids": {
-                        "bump_reminder_channel": channel.id
-                    }
-                }
-            )
-
-        # If it is
-        else:
-
-            # Try to get channel ids
-            try:
-                channel_ids = self._bot.db.find_one(
-                    {"guild_id": guild.id}
-                )["channel_ids"]
-
-                # Update channel ids
-                channel_ids["bump_reminder_channel"] = channel.id
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "channel_ids": channel_ids
-                        }
-                    }
-                )
-
-            # Create new channel ids if it doesnt exist
-            except KeyError:
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "channel_ids": {
-                                "bump_reminder_channel": channel.id
-                            }
-                        }
-                    }
-                )
+        await self._bot.db.set_channel(
+            guild.id,
+            "bump_reminder_channel",
+            channel.id
+        )
 
         # Prompt success
         emoji = self._bot.emoji_group.get_emoji("green_tick")
@@ -249,51 +168,9 @@ class SetupCommands(Cog):
             )
         )
 
-        # Check if guild document is created
+        # Update guild document
         guild: Guild = ctx.guild
-        if not self._bot.db.find_one(filter={"guild_id": guild.id}):
-
-            # Create new document
-            self._bot.db.insert_one(
-                {
-                    "guild_id": guild.id,
-                    "role_ids": {
-                        "server_bumper_role": role.id
-                    }
-                }
-            )
-
-        # If it is
-        else:
-            # Try to get role ids
-            try:
-                role_ids = self._bot.db.find_one(
-                    {"guild_id": guild.id}
-                )["role_ids"]
-
-                # Update role ids
-                role_ids["server_bumper_role"] = role.id
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "role_ids": role_ids
-                        }
-                    }
-                )
-
-            # Create new role ids key if it doesnot exist
-            except KeyError:
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "role_ids": {
-                                "server_bumper_role": role.id
-                            }
-                        }
-                    }
-                )
+        await self._bot.db.set_role(guild.id, "server_bumper_role", role.id)
 
         # Prompt success
         emoji = self._bot.emoji_group.get_emoji("green_tick")
@@ -340,51 +217,10 @@ class SetupCommands(Cog):
             )
         )
 
-        # Check if guild document is created
+        # Update guild document
         guild: Guild = ctx.guild
-        if not self._bot.db.find_one(filter={"guild_id": guild.id}):
-
-            # Create new document
-            self._bot.db.insert_one(
-                {
-                    "guild_id": guild.id,
-                    "channel_ids": {
-                        "console_channel": channel.id
-                    }
-                }
-            )
+        await self._bot.db.set_channel(guild.id, "console_channel", channel.id)
 
-        # If it is
-        else:
-            # Try to get channel ids
-            try:
-                channel_ids = self._bot.db.find_one(
-                    {"guild_id": guild.id}
-                )["channel_ids"]
-
-                # Update channel ids
-                channel_ids["console_channel"] = channel.id
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "channel_ids": channel_ids
-                        }
-                    }
-                )
-
-            # Create new channel ids key if it doesnot exist
-            except KeyError:
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "channel_ids": {
-                                "console_channel": channel.id
-                            }
-                        }
-                    }
-                )
         # Prompt success
         emoji = self._bot.emoji_group.get_emoji("green_tick")
         await res.edit_original_response(
@@ -430,51 +266,13 @@ class SetupCommands(Cog):
             )
         )
 
-        # Check if guild document is created
+        # Update guild document
         guild: Guild = ctx.guild
-        if not self._bot.db.find_one(filter={"guild_id": guild.id}):
-
-            # Create new document
-            self._bot.db.insert_one(
-                {
-                    "guild_id": guild.id,
-                    "channel_ids": {
-                        "suggestions_channel": channel.id
-                    }
-                }
-            )
-
-        # If it is
-        else:
-            # Try to get channel ids
-            try:
-                channel_ids = self._bot.db.find_one(
-                    {"guild_id": guild.id}
-                )["channel_ids"]
-
-                # Update channel ids
-                channel_ids["suggestions_channel"] = channel.id
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "channel_ids": channel_ids
-                        }
-                    }
-                )
-
-            # Create new channel ids key if it doesnot exist
-            except KeyError:
-                self._bot.db.update_one(
-                    self._bot.db.find_one(filter={"guild_id": guild.id}),
-                    {
-                        "$set": {
-                            "channel_ids": {
-                                "suggestions_channel": channel.id
-                            }
-                        }
-                    }
-                )
+        await self._bot.db.set_channel(
+            guild.id,
+            "suggestions_channel",
+            channel.id
+        )
 
         # Prompt success
         emoji = self._bot.emoji_group.get_emoji("green_tick")
@@ -510,17 +308,9 @@ class SetupCommands(Cog):
             )
         )
 
-        # Check if guild document is created
+        # Create guild document if it doesn't exist
         guild: Guild = ctx.guild
-        if not self._bot.db.find_one(filter={"guild_id": guild.id}):
-
-            # Create new document
-            self._bot.db.insert_one(
-                {
-                    "guild_id": guild.id,
-                    "reaction_messages": {}
-                }
-            )
+        await self._bot.db.create_guild_config(guild.id)
 
         # Prompt success
         emoji = self._bot.emoji_group.get_emoji("green_tick")
@@ -6,6 +6,8 @@ from discord import Intents
 from .bot import Reflect
 from .commands.usage import Help
 from .commands.setup import SetupCommands
+from .commands.emoji import EmojiCommands
+from .commands.filter import FilterCommands
 from .commands.youtube import YoutubeCommands
 from .commands.general import GeneralCommands
 from .commands.moderation import ModerationCommands
@@ -41,6 +43,8 @@ def main() -> None:
     # Add application commands
     BOT.add_cog(Help(BOT))
     BOT.add_cog(SetupCommands(BOT))
+    BOT.add_cog(EmojiCommands(BOT))
+    BOT.add_cog(FilterCommands(BOT))
     BOT.add_cog(YoutubeCommands(BOT))
     BOT.add_cog(GeneralCommands(BOT))
     BOT.add_cog(ModerationCommands(BOT))
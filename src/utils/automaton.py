@@ -0,0 +1,93 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton matching many patterns in one
+    linear pass over a text
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """
+        Compile the automaton
+
+        Args:
+            patterns (Iterable[str]): Patterns to match. Empty and
+                                      duplicate patterns are ignored.
+        """
+
+        # State 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        self.patterns: List[str] = []
+
+        # Build the trie
+        for pattern in dict.fromkeys(patterns):
+            if not pattern:
+                continue
+
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+
+                state = next_state
+
+            self._output[state] += (pattern,)
+            self.patterns.append(pattern)
+
+        # Link failures breadth first, so shorter suffixes are done first
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] += self._output[fail]
+
+        self.max_length = max(map(len, self.patterns), default=0)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Find every occurrence of every pattern, overlapping ones included
+
+        Args:
+            text (str): The text to search
+
+        Yields:
+            Tuple[int, int, str]: (start, end, pattern), end exclusive
+        """
+
+        goto, fail, output = self._goto, self._fail, self._output
+
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(char, 0)
+
+            for pattern in output[state]:
+                yield index + 1 - len(pattern), index + 1, pattern
+
+    def __len__(self) -> int:
+        """
+        Number of patterns
+        """
+
+        return len(self.patterns)
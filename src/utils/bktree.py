@@ -0,0 +1,146 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree finding the words within an edit distance
+    of a query without comparing it to every word
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        """
+        Build the tree
+
+        Args:
+            words (Iterable[str]): Words, duplicates are ignored
+        """
+
+        # (word, {distance to word => child node})
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        self._size = 0
+
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        """
+        Add a word
+
+        Args:
+            word (str): Word
+        """
+
+        if self._root is None:
+            self._root = (word, {})
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            distance = levenshtein(word, node[0])
+            if not distance:
+                return
+
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                self._size += 1
+                return
+
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Find the words within `max_distance` edits of a word
+
+        Args:
+            word (str): Query
+            max_distance (int): Max edit distance
+
+        Returns:
+            List[Tuple[int, str]]: (distance, word), closest first
+        """
+
+        results = []
+        stack = [self._root] if self._root else []
+
+        while stack:
+            node_word, children = stack.pop()
+
+            distance = levenshtein(word, node_word)
+            if distance <= max_distance:
+                results.append((distance, node_word))
+
+            # By the triangle inequality only these subtrees can match
+            for child_distance in range(
+                distance - max_distance,
+                distance + max_distance + 1
+            ):
+                child = children.get(child_distance)
+                if child:
+                    stack.append(child)
+
+        return sorted(results)
+
+    def __len__(self) -> int:
+        """
+        Number of words
+        """
+
+        return self._size
+
+
+def levenshtein(a: str, b: str) -> int:
+    """
+    Number of single character insertions, deletions and
+    substitutions that turn one string into another.
+
+    Uses Myers' bit-vector algorithm, one column of the edit
+    distance table per character of `a` in a few integer operations.
+
+    Args:
+        a (str): String
+        b (str): String
+
+    Returns:
+        int: Edit distance
+    """
+
+    if len(a) < len(b):
+        a, b = b, a
+
+    if not b:
+        return len(a)
+
+    # Bit i of peq[char] is set if b[i] == char
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(b):
+        peq[char] = peq.get(char, 0) | 1 << i
+
+    mask = (1 << len(b)) - 1
+    last = 1 << (len(b) - 1)
+
+    # Vertical positive and negative deltas
+    pv, mv = mask, 0
+    distance = len(b)
+
+    for char in a:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+
+        # Horizontal positive and negative deltas
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+
+        if ph & last:
+            distance += 1
+        elif mh & last:
+            distance -= 1
+
+        ph = (ph << 1 | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+
+    return distance
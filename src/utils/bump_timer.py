@@ -1,6 +1,6 @@
 import datetime
 
-from pymongo.collection import Collection
+from .db import GuildDatabase
 
 
 class BumpTimer:
@@ -8,9 +8,9 @@ class BumpTimer:
     Feature: Bump Reminder
     """
 
-    def update_bump_time(
+    async def update_bump_time(
         self,
-        collection: Collection,
+        database: GuildDatabase,
         guild_id: int,
         timestamp: datetime.datetime
     ) -> None:
@@ -19,13 +19,14 @@ class BumpTimer:
 
         Args:
             timestamp (datetime): Bump timestamp
+
+        Raises:
+            TypeError: If the guild document doesn't exist
         """
 
         # Update bump timestamp for a server
-        collection.update_one(
-            collection.find_one({"guild_id": guild_id}),
-            {"$set": {"bump_timestamp": timestamp}}
-        )
+        if not await database.set_bump_time(guild_id, timestamp):
+            raise TypeError(f"No document for guild {guild_id}")
 
     def get_bump_time(self, data: dict) -> datetime.datetime:
         """
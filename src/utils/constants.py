@@ -4,6 +4,49 @@
 
 # FILTER
 BADWORDS_FILE = "data/badwords.txt"
+# Max number of guilds with their own word lists kept compiled
+FILTER_MATCHER_CACHE_SIZE = 128
+# Seconds between checks of the word list file for changes
+FILTER_RELOAD_INTERVAL = 60
+# Fuzzy matching allows one typo per this many characters of a bad word
+FILTER_FUZZY_CHARS_PER_EDIT = 6
+# Max typos a guild can set for fuzzy matching
+FILTER_FUZZY_MAX_DISTANCE = 2
+# Number of recently seen words whose fuzzy match is remembered
+FILTER_FUZZY_CACHE_SIZE = 4096
+# Threads scanning attachments
+FILTER_SCAN_WORKERS = 2
+# Only the first bytes of a text attachment are scanned
+FILTER_ATTACHMENT_MAX_SIZE = 1024 * 1024
+# Bytes downloaded and scanned at a time
+FILTER_ATTACHMENT_CHUNK_SIZE = 64 * 1024
+# Attachments scanned as text
+FILTER_ATTACHMENT_EXTENSIONS = (
+    ".txt", ".md", ".py", ".js", ".ts", ".json", ".csv", ".log",
+    ".html", ".css", ".c", ".cpp", ".h", ".java", ".rs", ".go"
+)
+
+# EMOJIS
+# Max bytes of messages and their processed content AEWN remembers
+EMOJI_CACHE_MAX_SIZE = 1024 * 1024
+# Max number of guilds whose /emojis pages are kept
+EMOJI_PAGES_CACHE_SIZE = 32
+# Max suggestions of /emoji search, Discord shows up to 25
+EMOJI_SEARCH_LIMIT = 25
+# Emojis per column and columns per page of /emojis
+EMOJIS_PER_COLUMN = 10
+EMOJI_COLUMNS = 2
+
+# DATABASE
+# Seconds between guild cache reloads when change streams are unavailable
+GUILD_CACHE_POLL_INTERVAL = 300
+# Seconds before a failed change stream is watched again
+GUILD_CACHE_RETRY_INTERVAL = 30
+
+# Max seconds a deferred write (e.g. bump time) waits before it's flushed
+WRITE_BUFFER_FLUSH_INTERVAL = 30
+# Number of guilds with deferred writes that triggers an immediate flush
+WRITE_BUFFER_MAX_PENDING = 100
 
 # Messages - on_member_join & on_member_remove
 WELCOME_MESSAGES = ["Welcome, **{}**. We hope you brought pizza.",
@@ -1,18 +1,681 @@
-from pymongo import MongoClient
-from pymongo.collection import Collection
+import asyncio
+import logging
+from copy import deepcopy
+from typing import Any, Dict, Iterable, List, Optional, Set
+from datetime import datetime
 
+from .storage import (
+    COLLSCAN,
+    GUILDS,
+    REACTION_ROLES,
+    Storage,
+    apply_update,
+    project
+)
+from .write_buffer import WriteBuffer
+from .constants import (
+    GUILD_CACHE_POLL_INTERVAL,
+    GUILD_CACHE_RETRY_INTERVAL,
+    WRITE_BUFFER_FLUSH_INTERVAL,
+    WRITE_BUFFER_MAX_PENDING
+)
+from .env import MONGO_DB_URI, SQLITE_DB_PATH
 
-def get_database(host: str) -> Collection:
+
+class GuildDatabase:
+    """
+    Non-blocking access to guild documents and reaction roles
+    with a write-through, process-local cache
+    """
+
+    def __init__(self, storage: Storage) -> None:
+        """
+        Initialize
+
+        Args:
+            storage (Storage): Storage backend
+        """
+
+        self._storage = storage
+        self._write_buffer = WriteBuffer(
+            storage,
+            WRITE_BUFFER_FLUSH_INTERVAL,
+            WRITE_BUFFER_MAX_PENDING
+        )
+
+        # guild_id => guild document
+        self._cache: Dict[int, dict] = {}
+        self._loaded = False
+
+        # message_id => {emoji name => role_id}, across all guilds
+        self._reaction_roles: Dict[int, Dict[str, int]] = {}
+
+        # Guild and message IDs written while each running load awaits,
+        # collection => IDs
+        self._loads: List[Dict[str, Set[int]]] = []
+
+    async def load(self) -> None:
+        """
+        Fill the cache with every guild document and
+        reaction role in one query each
+        """
+
+        written = {GUILDS: set(), REACTION_ROLES: set()}
+        self._loads.append(written)
+
+        try:
+            guilds = await self._storage.load_guilds()
+            rows = await self._storage.load_reaction_roles()
+        finally:
+            self._loads.remove(written)
+
+        cache = {
+            guild_data["guild_id"]: self._with_pending(guild_data)
+            for guild_data in guilds
+        }
+
+        reaction_roles = {}
+        for row in rows:
+            reaction_roles.setdefault(
+                row["message_id"], {}
+            )[row["emoji"]] = row["role_id"]
+
+        # Writes made while loading are newer than what was read
+        _keep_written(cache, self._cache, written[GUILDS])
+        _keep_written(
+            reaction_roles,
+            self._reaction_roles,
+            written[REACTION_ROLES]
+        )
+
+        self._cache, self._reaction_roles = cache, reaction_roles
+        self._loaded = True
+
+        logging.info(f"Cached config of {len(self._cache)} guild(s)")
+
+    async def ensure_indexes(self) -> None:
+        """
+        Create the indexes the bot's queries rely on, move reaction
+        roles still embedded in guild documents to their own rows and
+        warn about any query that still scans the whole collection
+        """
+
+        await self._storage.ensure_indexes()
+
+        # Reaction roles are only read from their own rows
+        count = await self._storage.migrate_reaction_messages()
+        if count:
+            logging.info(f"Migrated {count} reaction message(s)")
+
+        await self.explain_queries()
+
+    async def explain_queries(self) -> Dict[str, List[str]]:
+        """
+        Get the query plans of the common queries and log a warning
+        for each one that scans the whole collection
+
+        Returns:
+            Dict[str, List[str]]: Query name => winning plan stages
+        """
+
+        plans = await self._storage.explain_queries()
+        for name, stages in plans.items():
+            if COLLSCAN in stages:
+                logging.warning(f"Query '{name}' does a collection scan")
+
+        return plans
+
+    async def watch(self) -> None:
+        """
+        Keep the cache consistent with writes made by other processes.
+
+        Follows the backend's change notifications when it supports them
+        and falls back to reloading the cache every
+        GUILD_CACHE_POLL_INTERVAL seconds otherwise. Errors are logged
+        and never stop it.
+        """
+
+        while True:
+            try:
+                await self._storage.watch(self._apply_change)
+                break
+
+            except Exception as e:
+                logging.error(f"Guild config change stream failed: {e}")
+
+            # Catch up on the changes missed, then watch again
+            await asyncio.sleep(GUILD_CACHE_RETRY_INTERVAL)
+            await self._reload()
+
+        logging.info("Polling guild configs")
+
+        while True:
+            await asyncio.sleep(GUILD_CACHE_POLL_INTERVAL)
+            await self._reload()
+
+    async def _reload(self) -> None:
+        """
+        Reload the cache, logging instead of raising errors
+        """
+
+        try:
+            await self.load()
+        except Exception as e:
+            logging.error(f"Couldn't reload guild configs: {e}")
+
+    def _set_cached(
+        self,
+        collection: str,
+        key: int,
+        value: Optional[dict]
+    ) -> None:
+        """
+        Write a guild document or the reaction roles of a message
+        to the cache, so running loads don't overwrite it
+
+        Args:
+            collection (str): GUILDS or REACTION_ROLES
+            key (int): Guild ID or message ID
+            value (Optional[dict]): New value, None to remove it
+        """
+
+        cache = self._cache if collection == GUILDS else self._reaction_roles
+
+        if value is None:
+            cache.pop(key, None)
+        else:
+            cache[key] = value
+
+        for written in self._loads:
+            written[collection].add(key)
+
+    def _apply_change(
+        self,
+        collection: str,
+        key: Any,
+        document: Optional[dict]
+    ) -> None:
+        """
+        Apply a change made by another process to the cache
+
+        Args:
+            collection (str): Changed collection
+            key (Any): Document key
+            document (Optional[dict]): New document, None if deleted
+        """
+
+        if collection == GUILDS:
+            self._apply_guild_change(key, document)
+        else:
+            self._apply_reaction_change(key, document)
+
+    def _apply_guild_change(self, key: Any, guild_data: Optional[dict]) -> None:
+        """
+        Apply a guild document change to the cache
+
+        Args:
+            key (Any): Document key
+            guild_data (Optional[dict]): New document, None if deleted
+        """
+
+        if guild_data:
+            guild_data.pop("reaction_messages", None)
+            self._set_cached(
+                GUILDS,
+                guild_data["guild_id"],
+                self._with_pending(guild_data)
+            )
+            return
+
+        for guild_id, guild_data in list(self._cache.items()):
+            if guild_data.get("_id") == key:
+                self._set_cached(GUILDS, guild_id, None)
+                break
+
+    def _with_pending(self, guild_data: dict) -> dict:
+        """
+        Apply buffered writes to a document read from storage
+
+        Args:
+            guild_data (dict): Guild document
+
+        Returns:
+            dict: The same document
+        """
+
+        apply_update(
+            guild_data,
+            self._write_buffer.pending(guild_data["guild_id"]),
+            ()
+        )
+
+        return guild_data
+
+    def _apply_reaction_change(self, key: Any, row: Optional[dict]) -> None:
+        """
+        Apply a reaction role change to the index
+
+        Args:
+            key (Any): {"message_id", "emoji"}
+            row (Optional[dict]): New row, None if deleted
+        """
+
+        message_id = row["message_id"] if row else key["message_id"]
+        reactions = dict(self._reaction_roles.get(message_id, {}))
+
+        if row:
+            reactions[row["emoji"]] = row["role_id"]
+        else:
+            reactions.pop(key["emoji"], None)
+
+        self._set_cached(REACTION_ROLES, message_id, reactions or None)
+
+    async def get_guild_config(
+        self,
+        guild_id: int,
+        *fields: str
+    ) -> Optional[dict]:
+        """
+        Get the config document of a guild.
+
+        When `fields` are given only those (dotted) paths are returned,
+        otherwise the whole document is returned, shared with the cache,
+        and must not be modified.
+
+        Args:
+            guild_id (int): Guild ID
+            *fields (str): Paths to project, e.g. `channel_ids.console_channel`
+
+        Returns:
+            Optional[dict]: The document or None if it doesn't exist
+        """
+
+        # Once loaded, the cache holds every document
+        if guild_id in self._cache or self._loaded:
+            guild_data = self._cache.get(guild_id)
+
+            if guild_data and fields:
+                return project(guild_data, fields)
+
+            return guild_data
+
+        # Don't cache partial documents
+        guild_data = await self._storage.find_guild(guild_id, fields)
+        if guild_data and not fields:
+            self._set_cached(GUILDS, guild_id, self._with_pending(guild_data))
+
+        return guild_data
+
+    def get_reaction_roles(self, message_id: int) -> Optional[Dict[str, int]]:
+        """
+        Get the reaction roles of a message without any I/O
+
+        Args:
+            message_id (int): Message ID
+
+        Returns:
+            Optional[Dict[str, int]]: Emoji name => role ID or None if
+                                      the message has no reaction roles
+        """
+
+        return self._reaction_roles.get(message_id)
+
+    def get_guild_configs(self) -> List[dict]:
+        """
+        Get the cached config documents of all guilds
+
+        Returns:
+            List[dict]: Guild documents
+        """
+
+        return list(self._cache.values())
+
+    async def update_guild_config(
+        self,
+        guild_id: int,
+        set_fields: Optional[Dict[str, Any]] = None,
+        unset_fields: Iterable[str] = (),
+        set_on_insert: Optional[Dict[str, Any]] = None,
+        upsert: bool = True,
+        inc_fields: Optional[Dict[str, int]] = None,
+        add_to_set: Optional[Dict[str, Any]] = None,
+        pull_fields: Optional[Dict[str, Any]] = None
+    ) -> Optional[dict]:
+        """
+        Atomically update a guild document in a single round-trip and
+        write the result through to the cache.
+
+        Fields are dotted paths (e.g. `channel_ids.console_channel`), so
+        concurrent updates to sibling keys never overwrite each other.
+
+        Args:
+            guild_id (int): Guild ID
+            set_fields (dict, optional): Path => value to set
+            unset_fields (Iterable[str], optional): Paths to remove
+            set_on_insert (dict, optional): Path => value to set only
+                                            when the document is created
+            upsert (bool, optional): Create the document if it doesn't
+                                     exist. Defaults to True.
+            inc_fields (dict, optional): Path => number to add
+            add_to_set (dict, optional): Path of a list => value to add
+                                         unless the list has it
+            pull_fields (dict, optional): Path of a list => value
+                                          to remove
+
+        Returns:
+            Optional[dict]: The updated document or None if it doesn't exist
+        """
+
+        guild_data = await self._storage.update_guild(
+            guild_id,
+            set_fields or {},
+            unset_fields,
+            set_on_insert or {},
+            upsert,
+            inc_fields or {},
+            add_to_set or {},
+            pull_fields or {}
+        )
+
+        if guild_data:
+            self._set_cached(GUILDS, guild_id, self._with_pending(guild_data))
+
+        return guild_data
+
+    async def defer_update(
+        self,
+        guild_id: int,
+        set_fields: Dict[str, Any]
+    ) -> bool:
+        """
+        Update the cached document of a guild now and write the change
+        to storage in the next bulk flush. Meant for high-frequency
+        writes that can be lost if the process crashes.
+
+        Args:
+            guild_id (int): Guild ID
+            set_fields (dict): Path => value to set
+
+        Returns:
+            bool: False if the guild document doesn't exist
+        """
+
+        guild_data = await self.get_guild_config(guild_id)
+        if not guild_data:
+            return False
+
+        # Copy on write, readers may hold the cached document
+        guild_data = deepcopy(guild_data)
+        apply_update(guild_data, set_fields, ())
+
+        self._set_cached(GUILDS, guild_id, guild_data)
+        self._write_buffer.set(guild_id, set_fields)
+        return True
+
+    async def flush(self) -> None:
+        """
+        Write every deferred update to storage
+        """
+
+        await self._write_buffer.flush()
+
+    async def set_channel(
+        self,
+        guild_id: int,
+        name: str,
+        channel_id: int
+    ) -> None:
+        """
+        Set a feature channel, creating the guild document if needed
+
+        Args:
+            guild_id (int): Guild ID
+            name (str): Key under `channel_ids`
+            channel_id (int): Channel ID
+        """
+
+        await self.update_guild_config(
+            guild_id,
+            {f"channel_ids.{name}": channel_id}
+        )
+
+    async def set_role(self, guild_id: int, name: str, role_id: int) -> None:
+        """
+        Set a feature role, creating the guild document if needed
+
+        Args:
+            guild_id (int): Guild ID
+            name (str): Key under `role_ids`
+            role_id (int): Role ID
+        """
+
+        await self.update_guild_config(
+            guild_id,
+            {f"role_ids.{name}": role_id}
+        )
+
+    async def create_guild_config(self, guild_id: int) -> None:
+        """
+        Create the guild document unless it already exists
+
+        Args:
+            guild_id (int): Guild ID
+        """
+
+        await self.update_guild_config(
+            guild_id,
+            set_on_insert={"guild_id": guild_id}
+        )
+
+    async def set_filter_word(
+        self,
+        guild_id: int,
+        word: str,
+        list_name: Optional[str]
+    ) -> None:
+        """
+        Atomically move a word to a filter word list of a guild and
+        bump the lists' version, so compiled matchers of the old lists
+        are no longer used
+
+        Args:
+            guild_id (int): Guild ID
+            word (str): Word
+            list_name (Optional[str]): `allow` for words the guild
+                                       doesn't filter, `deny` for words
+                                       it filters on top of the list,
+                                       None to remove it from both
+        """
+
+        await self.update_guild_config(
+            guild_id,
+            inc_fields={"filter.version": 1},
+            add_to_set={f"filter.{list_name}": word} if list_name else None,
+            pull_fields={
+                f"filter.{other}": word
+                for other in ("allow", "deny")
+                if other != list_name
+            }
+        )
+
+    async def set_filter_fuzziness(self, guild_id: int, distance: int) -> None:
+        """
+        Set how many typos away from a bad word the filter still matches
+
+        Args:
+            guild_id (int): Guild ID
+            distance (int): Max edit distance, 0 turns fuzzy matching off
+        """
+
+        await self.update_guild_config(guild_id, {"filter.fuzzy": distance})
+
+    async def set_filter_attachments(
+        self,
+        guild_id: int,
+        enabled: bool
+    ) -> None:
+        """
+        Turn scanning of text attachments and embeds on or off
+
+        Args:
+            guild_id (int): Guild ID
+            enabled (bool): Scan attachments and embeds
+        """
+
+        await self.update_guild_config(
+            guild_id,
+            {"filter.attachments": enabled}
+        )
+
+    async def set_reaction_message(
+        self,
+        guild_id: int,
+        message_id: int,
+        reactions: Dict[str, int]
+    ) -> bool:
+        """
+        Replace the reaction roles of a message
+
+        Args:
+            guild_id (int): Guild ID
+            message_id (int): Message ID
+            reactions (dict): Emoji name => role ID
+
+        Returns:
+            bool: False if the guild document doesn't exist
+        """
+
+        if not await self.get_guild_config(guild_id):
+            return False
+
+        await self._storage.replace_reaction_roles(
+            guild_id, message_id, reactions
+        )
+
+        self._set_cached(REACTION_ROLES, message_id, dict(reactions))
+        return True
+
+    async def remove_reaction_message(
+        self,
+        guild_id: int,
+        message_id: int
+    ) -> bool:
+        """
+        Remove the reaction roles of a message of the guild
+
+        Args:
+            guild_id (int): Guild ID
+            message_id (int): Message ID
+
+        Returns:
+            bool: False if the guild document doesn't exist
+        """
+
+        if not await self.get_guild_config(guild_id):
+            return False
+
+        # Only a message of this guild leaves the index
+        if await self._storage.delete_reaction_roles(guild_id, message_id):
+            self._set_cached(REACTION_ROLES, message_id, None)
+
+        return True
+
+    async def migrate_reaction_messages(self) -> int:
+        """
+        Move the reaction roles embedded in guild documents to their
+        own rows. Running it again is a no-op.
+
+        Returns:
+            int: Number of migrated messages
+        """
+
+        count = await self._storage.migrate_reaction_messages()
+
+        await self.load()
+        return count
+
+    async def set_bump_time(
+        self,
+        guild_id: int,
+        timestamp: datetime,
+        durable: bool = False
+    ) -> bool:
+        """
+        Set the last bump time of a guild
+
+        Args:
+            guild_id (int): Guild ID
+            timestamp (datetime): Bump timestamp
+            durable (bool, optional): Write to storage before returning
+                                      instead of deferring the write.
+                                      Defaults to False.
+
+        Returns:
+            bool: False if the guild document doesn't exist
+        """
+
+        if not durable:
+            return await self.defer_update(
+                guild_id,
+                {"bump_timestamp": timestamp}
+            )
+
+        guild_data = await self.update_guild_config(
+            guild_id,
+            {"bump_timestamp": timestamp},
+            upsert=False
+        )
+
+        return guild_data is not None
+
+    async def close(self) -> None:
+        """
+        Flush deferred updates and close the storage backend
+        """
+
+        await self._write_buffer.close()
+        await self._storage.close()
+
+
+def _keep_written(loaded: dict, cached: dict, written: Set[int]) -> None:
+    """
+    Replace loaded values by the cached ones written during the load
+
+    Args:
+        loaded (dict): Values read by the load
+        cached (dict): Current cache
+        written (Set[int]): Keys written during the load
+    """
+
+    for key in written:
+        if key in cached:
+            loaded[key] = cached[key]
+        else:
+            loaded.pop(key, None)
+
+
+def get_database(backend: str = "mongo") -> GuildDatabase:
     """
     Get guild database
 
     Args:
-        host (str): MONGO_DB URI
+        backend (str, optional): Storage backend, `mongo` or `sqlite`.
+                                 Defaults to "mongo".
 
     Returns:
-        Collection: A collection of documents
+        GuildDatabase: Async access to the guild documents
+
+    Raises:
+        ValueError: If the backend is unknown
     """
-    CLIENT = MongoClient(host=host)
 
-    # Create the database
-    return CLIENT["reflect"]["guilds"]
+    # Import lazily so the embedded backend runs without Mongo drivers
+    if backend == "mongo":
+        from .mongo import MongoStorage
+        return GuildDatabase(MongoStorage(MONGO_DB_URI))
+
+    if backend == "sqlite":
+        from .sqlite import SQLiteStorage
+        return GuildDatabase(SQLiteStorage(SQLITE_DB_PATH))
+
+    raise ValueError(f"Unknown storage backend {backend}")
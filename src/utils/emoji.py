@@ -1,9 +1,43 @@
+import re
+import sys
 import logging
-from re import DOTALL, findall
+from itertools import count
+from bisect import bisect_left
+from heapq import merge
 from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Set, Tuple
+from cachetools import LRUCache
 from discord import Emoji, Bot, Guild
 
 from .env import REFLECT_GUILD_ID
+from .constants import EMOJI_CACHE_MAX_SIZE, EMOJI_SEARCH_LIMIT
+
+# Everything process_emojis looks at, in one left-to-right scan:
+# code blocks and spans, rendered emojis and emoji names
+_TOKENS = re.compile(
+    r"(?P<code>```.+?```|``.+?``|`[^`]+`)"
+    r"|(?P<emoji><a?:\w+:\d+>)"
+    r"|:(?P<name>[\w\-~]+):",
+    re.DOTALL
+)
+
+# Every `:name:`, overlapping ones included, e.g. both in "12:00:pog:"
+_NAMES = re.compile(r"(?=:([\w\-~]+):)")
+
+# Versions of all groups, a group created on reconnect
+# never reuses the version of the one it replaces
+_VERSIONS = count(1)
+
+
+class CacheInfo(NamedTuple):
+    """
+    Usage of the processed message cache
+    """
+
+    hits: int
+    misses: int
+    size: int
+    max_size: int
 
 
 class EmojiGroup:
@@ -20,33 +54,185 @@ class EmojiGroup:
         """
 
         self._bot = bot
-        self._emojis = OrderedDict()
 
-        # Iterate through the server emojis
-        temp = {}
+        # guild_id => {alias => emoji_id}, in the order guilds are searched
+        self._emojis: Dict[int, Dict[str, int]] = OrderedDict()
+
+        # alias => emoji IDs, first guild first
+        self._index: Dict[str, List[int]] = {}
+
+        # (lowercase alias, alias) of every alias in the index, sorted
+        self._sorted_aliases: List[Tuple[str, str]] = []
+
+        # name => [(guild_id, emoji_id)] of every emoji with that name,
+        # ordered like the guilds, and the aliases derived from them
+        self._occurrences: Dict[str, List[Tuple[int, int]]] = {}
+        self._aliases: Dict[str, List[Tuple[int, str, int]]] = {}
+
+        # guild_id => names of its emojis, and position in the search order
+        self._guild_names: Dict[int, Set[str]] = {}
+        self._guild_rank: Dict[int, int] = {}
+
+        # Changes whenever an alias changes
+        self._version = next(_VERSIONS)
+
+        # (guild_id, content, version) => (content, processed content),
+        # entries of older versions are evicted as they get old
+        self._cache: LRUCache = LRUCache(
+            maxsize=EMOJI_CACHE_MAX_SIZE,
+            getsizeof=_cache_entry_size
+        )
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # Collect the occurrences of every name, keeping the order of
+        # the guilds, then alias each name once
         emoji: Emoji
         for emoji in self._bot.emojis:
-            guild_id = emoji.guild_id
+            if emoji.guild_id not in self._emojis:
+                self._emojis[emoji.guild_id] = {}
+                self._guild_rank[emoji.guild_id] = len(self._guild_rank)
+                self._guild_names[emoji.guild_id] = set()
+
+            self._guild_names[emoji.guild_id].add(emoji.name)
+            self._occurrences.setdefault(emoji.name, []).append(
+                (emoji.guild_id, emoji.id)
+            )
+
+        rank = self._guild_rank
+        for name, occurrences in self._occurrences.items():
+            occurrences.sort(key=lambda occurrence: rank[occurrence[0]])
+            self._realias(name)
+
+        self._sorted_aliases = sorted(
+            (alias.lower(), alias) for alias in self._index
+        )
+
+    def _set_guild_emojis(self, guild_id: int, emojis: List[Emoji]) -> None:
+        """
+        Replace the emojis of a guild. Only the names the guild had or
+        has are re-aliased, and it runs without awaiting, so coroutines
+        never see a partial update.
+
+        Args:
+            guild_id (int): Guild ID
+            emojis (List[Emoji]): All emojis of the guild
+        """
+
+        # Guilds keep their place in the search order
+        if guild_id not in self._emojis:
+            self._emojis[guild_id] = {}
+            self._guild_rank[guild_id] = len(self._guild_rank)
+
+        rank = self._guild_rank
+        self._version = next(_VERSIONS)
+
+        new_occurrences: Dict[str, List[Tuple[int, int]]] = {}
+        for emoji in emojis:
+            new_occurrences.setdefault(emoji.name, []).append(
+                (guild_id, emoji.id)
+            )
+
+        old_names = self._guild_names.get(guild_id, set())
+        self._guild_names[guild_id] = set(new_occurrences)
+
+        removed: Set[str] = set()
+        created: Set[str] = set()
+
+        for name in old_names | self._guild_names[guild_id]:
+            occurrences = [
+                occurrence
+                for occurrence in self._occurrences.get(name, [])
+                if occurrence[0] != guild_id
+            ]
+
+            # Insert after the guilds searched before this one
+            position = sum(
+                1 for other, _ in occurrences if rank[other] < rank[guild_id]
+            )
+            occurrences[position:position] = new_occurrences.get(name, [])
+
+            if occurrences:
+                self._occurrences[name] = occurrences
+            else:
+                self._occurrences.pop(name, None)
+
+            name_removed, name_created = self._realias(name)
+            removed |= name_removed
+            created |= name_created
+
+        # Update the sorted aliases once, aliases that were dropped and
+        # added back again keep their entry
+        gone = removed - created
+        new = sorted((alias.lower(), alias) for alias in created - removed)
+        if gone or new:
+            self._sorted_aliases = list(merge(
+                (entry for entry in self._sorted_aliases
+                 if entry[1] not in gone),
+                new
+            ))
+
+    def _realias(self, name: str) -> Tuple[Set[str], Set[str]]:
+        """
+        Recompute the aliases of every emoji with a name.
+
+        The first emoji named `name` is `name`, the next ones `name-2`,
+        `name-3`, ... and every guild can also use its own emoji as
+        `name`, the first one if it has several. If another guild has
+        the name too, the first one is also `name-1`.
+
+        Args:
+            name (str): Emoji name
+
+        Returns:
+            Tuple[Set[str], Set[str]]: Aliases removed from and added to
+            the index
+        """
+
+        removed: Set[str] = set()
+        created: Set[str] = set()
 
-            if not guild_id in self._emojis:
-                self._emojis[guild_id] = {}
+        # Drop the old aliases, no other name shares them
+        for guild_id, alias, _ in self._aliases.pop(name, []):
+            self._emojis[guild_id].pop(alias, None)
 
-            i, alias = 2, emoji.name
-            while alias in temp:
-                alias = alias.split("-")[0] + f"-{i}"
-                i += 1
+            if self._index.pop(alias, None) is not None:
+                removed.add(alias)
 
-            temp[alias] = guild_id
-            if alias != emoji.name and temp[alias.split("-")[0]] != guild_id:
-                original = self._emojis[temp[emoji.name]]
-                original_alias = f"{emoji.name}-1"
+        occurrences = self._occurrences.get(name)
+        if not occurrences:
+            return removed, created
 
-                if not original.get(original_alias):
-                    original[original_alias] = original[emoji.name]
+        first_guild_id, first_emoji_id = occurrences[0]
+        aliases = [(first_guild_id, name, first_emoji_id)]
 
-                self._emojis[guild_id][emoji.name] = emoji.id
+        for i, (guild_id, emoji_id) in enumerate(occurrences[1:], 2):
+            if guild_id != first_guild_id:
+                aliases.append((guild_id, name, emoji_id))
 
-            self._emojis[guild_id][alias] = emoji.id
+            aliases.append((guild_id, f"{name}-{i}", emoji_id))
+
+        if any(guild_id != first_guild_id for guild_id, _ in occurrences):
+            aliases.append((first_guild_id, f"{name}-1", first_emoji_id))
+
+        # Add the new ones, a guild's first emoji with the name wins.
+        # They are in guild order, and so are the index entries.
+        added = []
+        for guild_id, alias, emoji_id in aliases:
+            if alias in self._emojis[guild_id]:
+                continue
+
+            self._emojis[guild_id][alias] = emoji_id
+
+            if alias not in self._index:
+                self._index[alias] = []
+                created.add(alias)
+
+            self._index[alias].append(emoji_id)
+            added.append((guild_id, alias, emoji_id))
+
+        self._aliases[name] = added
+        return removed, created
 
     def get_emoji(self, name: str, guild_id: int = REFLECT_GUILD_ID) -> Emoji:
         """
@@ -63,101 +249,237 @@ class EmojiGroup:
             return self._bot.get_emoji(self._emojis[guild_id][name])
 
         # Raise AttributeError if name does not exist
-        res = list(filter(
-            lambda emojis: name in emojis, self._emojis.values()
-        ))
-
-        if not res:
+        emoji_ids = self._index.get(name)
+        if not emoji_ids:
             raise AttributeError(
                 f"Object of type EmojiGroup has no attribute {name}"
             )
 
-        # Otherwise return the emoji id
-        return self._bot.get_emoji(res[0][name])
+        # Otherwise return the emoji of the first guild that has it
+        return self._bot.get_emoji(emoji_ids[0])
+
+    @property
+    def version(self) -> int:
+        """
+        Version of the aliases, unique across groups. Anything
+        derived from the aliases is stale once it changes.
+        """
+
+        return self._version
+
+    def search(
+        self,
+        prefix: str,
+        limit: int = EMOJI_SEARCH_LIMIT
+    ) -> List[str]:
+        """
+        Find aliases by prefix, ignoring case. Only the matches
+        are looked at, found by binary search in the sorted aliases.
+
+        Args:
+            `prefix` (str): Start of the alias
+            `limit` (int, optional): Max number of aliases
+
+        Returns:
+            List[str]: Aliases in alphabetical order
+        """
+
+        prefix = prefix.strip(": ").lower()
+        aliases = []
+
+        position = bisect_left(self._sorted_aliases, (prefix,))
+        for key, alias in self._sorted_aliases[position:position + limit]:
+            if not key.startswith(prefix):
+                break
+
+            aliases.append(alias)
+
+        return aliases
 
-    async def update_emojis(self, guild: Guild, updated_emojis=None) -> None:
+    def usable_emojis(self, guild_id: int) -> List[Tuple[str, Emoji]]:
         """
-        Update client emojis
+        Get every emoji the bot can use once, with the alias that
+        gets it in a guild. The guild's own emojis come first.
+
+        Args:
+            `guild_id` (int): Guild ID
+
+        Returns:
+            List[Tuple[str, Emoji]]: (alias, emoji)
         """
 
-        if updated_emojis:
-            self.__init__(self._bot)
-            return
+        guilds = list(self._emojis)
+        if guild_id in self._emojis:
+            guilds.remove(guild_id)
+            guilds.insert(0, guild_id)
+
+        seen_aliases = set()
+        seen_ids = set()
+        emojis = []
+
+        for other_guild_id in guilds:
+            for alias, emoji_id in self._emojis[other_guild_id].items():
+                # An alias used by an earlier guild gets that guild's
+                # emoji, and an emoji is listed under its first alias
+                if alias in seen_aliases or emoji_id in seen_ids:
+                    continue
+
+                emoji = self._bot.get_emoji(emoji_id)
+                if not emoji or not emoji.is_usable():
+                    continue
+
+                emojis.append((alias, emoji))
+                seen_aliases.add(alias)
+                seen_ids.add(emoji_id)
+
+        return emojis
+
+    async def update_emojis(
+        self,
+        guild: Guild,
+        updated_emojis: List[Emoji] = None
+    ) -> None:
+        """
+        Update the emojis of one guild
+
+        Args:
+            `guild` (Guild): The guild
+            `updated_emojis` (List[Emoji], optional): All emojis of the
+                                                      guild. Defaults to
+                                                      `guild.emojis`.
+        """
 
-        self._emojis[guild.id] = await guild.fetch_emojis()
+        if updated_emojis is None:
+            updated_emojis = guild.emojis
+
+        self._set_guild_emojis(guild.id, updated_emojis)
+
+    def has_emojis(self, content: str) -> bool:
+        """
+        Check if a message has a `:name:` of a known emoji, without
+        copying the message. Most messages have none, so AEWN is
+        skipped for them.
+
+        Args:
+            `content` (str): Message content
+
+        Returns:
+            bool: True if process_emojis may change the message
+        """
+
+        if ":" not in content:
+            return False
+
+        return any(
+            match.group(1) in self._index
+            for match in _NAMES.finditer(content)
+        )
 
     async def process_emojis(
         self,
         content: str,
         guild_id: int = REFLECT_GUILD_ID
     ) -> str:
-        emoji = None
-        processedCount = 0
+        """
+        Replace `:name:` by the emoji in one pass over the message.
+        Code spans and blocks and emojis that are already
+        rendered are left as they are.
 
-        # Insert space between two :: and ><
-        msg_copy = content
-        while "::" in msg_copy:
-            msg_copy = msg_copy.replace("::", ": :")
+        Args:
+            `content` (str): Message content
+            `guild_id` (int, optional): Guild the message was sent in
 
-        while "><" in msg_copy:
-            msg_copy = msg_copy.replace("><", "> <")
+        Returns:
+            str: Processed content, `content` itself if nothing changed
+        """
 
-        # Remove codeblocks from message
-        codeblocks: set = set(
-            findall(r"(`{1,3}.+?`{1,3})+", msg_copy, flags=DOTALL)
-        )
+        # No name to replace
+        if ":" not in content:
+            return content
 
-        BLOCK_ID_FORMAT = "<CodeBlock => @Index: {}>"
-        for idx, block in enumerate(codeblocks):
-            if block.split("`").count("") % 2 != 0:
-                continue
+        key = (guild_id, content, self._version)
+        entry = self._cache.get(key)
+        if entry:
+            self._cache_hits += 1
+            return content if entry[1] is entry[0] else entry[1]
 
-            msg_copy = msg_copy.replace(block, BLOCK_ID_FORMAT.format(idx))
+        self._cache_misses += 1
+        processed = self._replace_emojis(content, guild_id)
 
-        # Search for emojis
-        emojis: set = set(findall(r"(:[\w\-~]*:)+", msg_copy))
-        processed_emojis: dict = {
-            f":{emoji.split(':')[1]}:": True
-            for emoji in findall(r"(<a?:\w+:\d+>)+", msg_copy)
-        }
+        # Messages larger than the whole cache are not remembered
+        entry = (content, processed)
+        if _cache_entry_size(entry) <= self._cache.maxsize:
+            self._cache[key] = entry
 
-        # Return if all emojis are already processed
-        if len(emojis) - len(processed_emojis) == 0:
-            return content
+        return processed
+
+    def _replace_emojis(self, content: str, guild_id: int) -> str:
+        """
+        Replace `:name:` by the emoji, without the cache
 
-        for word in emojis:
-            # Skip if already processed
-            if word in processed_emojis:
+        Args:
+            `content` (str): Message content
+            `guild_id` (int): Guild the message was sent in
+
+        Returns:
+            str: Processed content, `content` itself if nothing changed
+        """
+
+        parts = []
+        position = 0
+        search_from = 0
+
+        while True:
+            token = _TOKENS.search(content, search_from)
+            if not token:
+                break
+
+            name = token.group("name")
+            search_from = token.end()
+
+            # Code and rendered emojis stay as they are
+            if not name:
                 continue
 
             try:
-                # Get emoji
-                emoji = self.get_emoji(
-                    word[1:-1],
-                    guild_id
-                )
-
-                # Skip if not a valid emoji
-                if not emoji:
-                    continue
-
-                # Replace the word by its emoji
-                msg_copy = msg_copy.replace(word, str(emoji))
-                processedCount += 1
+                emoji = self.get_emoji(name, guild_id)
 
             # Don't do anything if emoji was not found
             except AttributeError as e:
                 logging.error(e)
+                emoji = None
+
+            # The closing colon may open the next name, e.g. "12:00:pog:"
+            if not emoji:
+                search_from -= 1
+                continue
+
+            # Replace the name by its emoji
+            parts.append(content[position:token.start()])
+            parts.append(str(emoji))
+            position = token.end()
 
         # Return for no emoji
-        if processedCount == 0:
+        if not parts:
             return content
 
-        # Add codeblocks back to the message
-        for idx, block in enumerate(codeblocks):
-            msg_copy = msg_copy.replace(BLOCK_ID_FORMAT.format(idx), block)
+        parts.append(content[position:])
+        return "".join(parts)
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Get the usage of the processed message cache
+
+        Returns:
+            CacheInfo: Hits, misses, size and max size in bytes
+        """
 
-        return msg_copy
+        return CacheInfo(
+            self._cache_hits,
+            self._cache_misses,
+            self._cache.currsize,
+            self._cache.maxsize
+        )
 
     def __repr__(self) -> str:
         """
@@ -165,3 +487,23 @@ class EmojiGroup:
         """
 
         return f"<EmojiGroup => EmojiCount: {len(self._emojis)}>"
+
+
+def _cache_entry_size(entry: Tuple[str, str]) -> int:
+    """
+    Bytes used by a message and its processed content
+
+    Args:
+        `entry` (Tuple[str, str]): Content and processed content
+
+    Returns:
+        int: Size in bytes, the content is counted once if unchanged
+    """
+
+    content, processed = entry
+    size = sys.getsizeof(content)
+
+    if processed is not content:
+        size += sys.getsizeof(processed)
+
+    return size
@@ -10,6 +10,8 @@ load_dotenv(".env")
 REFLECT_GUILD_ID = int(os.getenv("REFLECT_GUILD_ID"))
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 MONGO_DB_URI = os.getenv("MONGO_DB_URI")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "data/reflect.db")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
 try:
@@ -1,5 +1,324 @@
+import os
+import re
+import asyncio
 import logging
-from .constants import BADWORDS_FILE
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple
+)
+
+from cachetools import LRUCache
+from discord import Embed
+
+from .bktree import BKTree
+from .automaton import AhoCorasick
+from .constants import (
+    BADWORDS_FILE,
+    FILTER_FUZZY_CACHE_SIZE,
+    FILTER_FUZZY_CHARS_PER_EDIT,
+    FILTER_MATCHER_CACHE_SIZE,
+    FILTER_RELOAD_INTERVAL,
+    FILTER_SCAN_WORKERS
+)
+
+# Characters removed without splitting words, e.g. "f.u.c.k"
+_DELETED_CHARS = "`*.,:?!"
+
+# Combining marks and invisible format characters (zero-width
+# spaces and joiners, soft hyphens, ...) are dropped
+_DROPPED_CATEGORIES = ("Mn", "Me", "Cf")
+
+# Leetspeak, e.g. "b1tch"
+_LEET = {
+    "0": "o", "1": "i", "3": "e", "4": "a",
+    "5": "s", "7": "t", "@": "a", "$": "s", "+": "t",
+}
+
+# Non-Latin letters that look like Latin ones, after lowercasing.
+# Fullwidth and styled letters are handled by NFKD.
+_CONFUSABLES = {
+    # Cyrillic
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m",
+    "н": "h", "о": "o", "р": "p", "с": "c", "т": "t", "у": "y",
+    "х": "x", "ѕ": "s", "і": "i", "ї": "i", "ј": "j", "ԁ": "d",
+    "ԛ": "q", "ԝ": "w", "ь": "b",
+    # Greek
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k",
+    "ν": "v", "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "χ": "x",
+    # Latin
+    "ı": "i", "ɑ": "a", "ɡ": "g", "ȷ": "j",
+}
+
+# Runs of a repeated character, e.g. "fuuuck"
+_REPEATS = re.compile(r"(.)\1+")
+
+# Words of normalized text
+_TOKENS = re.compile(r"[^ ]+")
+
+
+def _fold(char: str) -> str:
+    """
+    Fold a character to the lowercase ASCII-ish letters it stands for
+
+    Args:
+        char (str): Character
+
+    Returns:
+        str: Folded letters, "" if dropped or " " if it separates words
+    """
+
+    folded = []
+    for part in unicodedata.normalize("NFKD", char).lower():
+        if unicodedata.category(part) in _DROPPED_CATEGORIES:
+            continue
+
+        part = _CONFUSABLES.get(part, _LEET.get(part, part))
+        if part in _DELETED_CHARS:
+            continue
+
+        folded.append(part if part.isalnum() else " ")
+
+    return "".join(folded)
+
+
+class _FoldTable(dict):
+    """
+    `str.translate` table folding each character,
+    computed on first use
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        folded = self[codepoint] = _fold(chr(codepoint))
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
+
+
+class Match(NamedTuple):
+    """
+    A bad word found in a text
+    """
+
+    start: int
+    end: int
+    word: str
+
+
+class WordMatcher:
+    """
+    A word list compiled for matching
+    """
+
+    def __init__(
+        self,
+        words: Iterable[str],
+        allowed: Iterable[str] = ()
+    ) -> None:
+        """
+        Compile the word list
+
+        Args:
+            words (Iterable[str]): Bad words
+            allowed (Iterable[str], optional): Normalized words never
+                                               matched by fuzzy matching
+        """
+
+        # Normalized word => [(word, run length of each character)],
+        # e.g. "fagit" => [("faggit", [1, 1, 2, 1, 1]), ("fagit", [1, ...])]
+        self._variants: Dict[str, List[Tuple[str, List[int]]]] = {}
+        for word in words:
+            normalized = _normalize(word)
+            if normalized:
+                self._variants.setdefault(normalized, []).append(
+                    (word, [run for _, _, run in _positions(word)])
+                )
+
+        # Try the longest spelling first, "asshole" before "ashole"
+        for variants in self._variants.values():
+            variants.sort(key=lambda variant: -sum(variant[1]))
+
+        # Compile single and multi-word entries into one automaton
+        self._automaton = AhoCorasick(self._variants)
+
+        # Single words long enough for fuzzy matching,
+        # indexed on the first fuzzy scan
+        self._fuzzy_words = [
+            word for word in self._variants
+            if " " not in word and len(word) >= FILTER_FUZZY_CHARS_PER_EDIT
+        ]
+        self._bktree: Optional[BKTree] = None
+        self._allowed = set(allowed)
+
+        # (word, max distance) => matched bad word or None,
+        # chat repeats the same words a lot
+        self._fuzzy_cache: LRUCache = LRUCache(
+            maxsize=FILTER_FUZZY_CACHE_SIZE
+        )
+
+    @property
+    def max_length(self) -> int:
+        """
+        Length of the longest normalized bad word
+        """
+
+        return self._automaton.max_length
+
+    def scan(self, text: str) -> List[Match]:
+        """
+        Find all bad words in a piece of text in one pass
+
+        Args:
+            `text` (str): The text to scan
+
+        Returns:
+            List[Match]: Matches with spans into `text`
+        """
+
+        normalized = _normalize(text)
+
+        spans = [
+            (start, end, pattern)
+            for start, end, pattern in self._automaton.iter_matches(
+                normalized
+            )
+            if (start == 0 or normalized[start - 1] == " ")
+            and (end == len(normalized) or normalized[end] == " ")
+        ]
+
+        if not spans:
+            return []
+
+        positions = _positions(text)
+
+        matches = []
+        for start, end, pattern in spans:
+            span = positions[start:end]
+            first, last = span[0][0], span[-1][1] + 1
+
+            # Plain numbers aren't leetspeak, e.g. "455"
+            if not any(
+                char.isalpha() or (char in _LEET and not char.isdigit())
+                for char in text[first:last]
+            ):
+                continue
+
+            # The text must repeat each letter at least as often as
+            # the word does, so "as" doesn't match "ass"
+            for word, runs in self._variants[pattern]:
+                if all(
+                    run <= position[2] for run, position in zip(runs, span)
+                ):
+                    matches.append(Match(first, last, word))
+                    break
+
+        return matches
+
+    def fuzzy_scan(self, text: str, max_distance: int) -> List[Match]:
+        """
+        Find words that are a few typos away from a bad word.
+
+        Only words of at least FILTER_FUZZY_CHARS_PER_EDIT characters are
+        matched, with at most one edit per FILTER_FUZZY_CHARS_PER_EDIT
+        characters of the bad word, so short words like "duck" are safe.
+        The first letter must match too, typos rarely hit it but it
+        tells apart words like "witches" and "sucker".
+
+        Args:
+            `text` (str): The text to scan
+            `max_distance` (int): Max edit distance
+
+        Returns:
+            List[Match]: Matches with spans into `text`
+        """
+
+        if not self._fuzzy_words or max_distance < 1:
+            return []
+
+        # Assign the tree last, it marks the index as built
+        if self._bktree is None:
+            self._fuzzy_bigrams = {
+                word[i:i + 2]
+                for word in self._fuzzy_words
+                for i in range(len(word) - 1)
+            }
+            self._fuzzy_max_length = max(map(len, self._fuzzy_words))
+            self._bktree = BKTree(self._fuzzy_words)
+
+        normalized = _normalize(text)
+
+        matches = []
+        positions = None
+        for token in _TOKENS.finditer(normalized):
+            word = token.group()
+
+            pattern = self._fuzzy_match(word, max_distance)
+            if pattern is None:
+                continue
+
+            if positions is None:
+                positions = _positions(text)
+
+            matches.append(Match(
+                positions[token.start()][0],
+                positions[token.end() - 1][1] + 1,
+                self._variants[pattern][0][0]
+            ))
+
+        return matches
+
+    def _fuzzy_match(self, word: str, max_distance: int) -> Optional[str]:
+        """
+        Find the closest bad word to a normalized word
+
+        Args:
+            `word` (str): Normalized word
+            `max_distance` (int): Max edit distance
+
+        Returns:
+            Optional[str]: Normalized bad word or None
+        """
+
+        # Cheap checks first, most words never reach the tree
+        if (
+            len(word) < FILTER_FUZZY_CHARS_PER_EDIT
+            or len(word) > self._fuzzy_max_length + max_distance
+            or not word.isalpha()
+            or word in self._allowed
+        ):
+            return None
+
+        key = (word, max_distance)
+        if key in self._fuzzy_cache:
+            return self._fuzzy_cache[key]
+
+        # Each edit changes at most two character pairs, so a close
+        # word shares most of its pairs with some bad word
+        shared = sum(
+            word[i:i + 2] in self._fuzzy_bigrams
+            for i in range(len(word) - 1)
+        )
+
+        match = None
+        if shared >= len(word) - 1 - 2 * max_distance:
+            for distance, pattern in self._bktree.search(word, max_distance):
+                if (
+                    distance <= len(pattern) // FILTER_FUZZY_CHARS_PER_EDIT
+                    and pattern[0] == word[0]
+                ):
+                    match = pattern
+                    break
+
+        self._fuzzy_cache[key] = match
+        return match
 
 
 class Filter:
@@ -7,18 +326,256 @@ class Filter:
         """
         Initialize filter
         """
-        self._BADWORDS = set()
 
-        # Try to extract words from the file
-        try:
-            with open(BADWORDS_FILE) as FILE:
-                self._BADWORDS = set(
-                    word.strip() for word in FILE.readlines()
+        # Shared by every guild without its own word lists,
+        # empty until the file can be read
+        self._mtime, self._BADWORDS, self._matcher = (
+            _compile() or (None, set(), WordMatcher(()))
+        )
+
+        # (guild_id, list version) => matcher of a guild with its own lists
+        self._guild_matchers: LRUCache = LRUCache(
+            maxsize=FILTER_MATCHER_CACHE_SIZE
+        )
+
+        # Scans long texts like attachments off the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=FILTER_SCAN_WORKERS,
+            thread_name_prefix="filter"
+        )
+
+    async def reload(self, force: bool = False) -> bool:
+        """
+        Reload the word list if the file changed. The new matcher is
+        compiled in a worker thread and swapped in at once, so scans
+        never see a partly built one.
+
+        Args:
+            `force` (bool, optional): Reload even if the file didn't
+                                      change. Defaults to False.
+
+        Returns:
+            bool: True if the word list was reloaded, False if it
+                  didn't change or the file couldn't be read
+        """
+
+        if not force and _mtime() == self._mtime:
+            return False
+
+        loop = asyncio.get_running_loop()
+        compiled = await loop.run_in_executor(None, _compile)
+
+        # Keep filtering with the current list, e.g. while a
+        # deploy replaces the file
+        if not compiled:
+            return False
+
+        mtime, words, matcher = compiled
+
+        # Guild matchers were compiled from the old list
+        self._mtime, self._BADWORDS, self._matcher, self._guild_matchers = (
+            mtime,
+            words,
+            matcher,
+            LRUCache(maxsize=FILTER_MATCHER_CACHE_SIZE)
+        )
+
+        logging.info(f"Reloaded filter with {len(words)} word(s)")
+        return True
+
+    async def watch(self) -> None:
+        """
+        Reload the word list whenever the file changes, checking
+        every FILTER_RELOAD_INTERVAL seconds
+        """
+
+        while True:
+            await asyncio.sleep(FILTER_RELOAD_INTERVAL)
+
+            try:
+                await self.reload()
+            except Exception as e:
+                logging.error(f"Couldn't reload filter: {e}")
+
+    def get_matcher(
+        self,
+        guild_id: int = None,
+        filter_config: dict = None
+    ) -> WordMatcher:
+        """
+        Get the matcher of a guild, compiling it on first use
+
+        Args:
+            `guild_id` (int, optional): Guild ID
+            `filter_config` (dict, optional): `filter` field of the guild
+                                              document, with `allow` and
+                                              `deny` word lists
+
+        Returns:
+            WordMatcher: The guild's matcher or the global one
+        """
+
+        if not filter_config:
+            return self._matcher
+
+        allow = filter_config.get("allow", [])
+        deny = filter_config.get("deny", [])
+        if not allow and not deny:
+            return self._matcher
+
+        key = (guild_id, filter_config.get("version", 0))
+        matcher = self._guild_matchers.get(key)
+
+        if matcher is None:
+            allowed = set(map(_normalize, allow))
+            matcher = self._guild_matchers[key] = WordMatcher(
+                [
+                    word for word in self._BADWORDS
+                    if _normalize(word) not in allowed
+                ] + deny,
+                allowed
+            )
+
+        return matcher
+
+    def scan(
+        self,
+        text: str,
+        guild_id: int = None,
+        filter_config: dict = None
+    ) -> List[Match]:
+        """
+        Find all bad words in a piece of text in one pass.
+
+        Matching is case-insensitive and sees through leetspeak,
+        repeated letters, accents, lookalike letters and invisible
+        characters. Only whole words count, so "ass" is found in
+        "A$$!" but not in "class". Guilds that set `fuzzy` also get
+        words within that many typos of a bad word.
+
+        Args:
+            `text` (str): The text to scan
+            `guild_id` (int, optional): Guild ID
+            `filter_config` (dict, optional): The guild's word lists and
+                                              fuzziness, see `get_matcher`
+
+        Returns:
+            List[Match]: Matches with spans into `text`
+        """
+
+        matcher = self.get_matcher(guild_id, filter_config)
+        matches = matcher.scan(text)
+
+        max_distance = (filter_config or {}).get("fuzzy", 0)
+        if max_distance:
+            matches += [
+                fuzzy for fuzzy in matcher.fuzzy_scan(text, max_distance)
+                if not any(
+                    match.start < fuzzy.end and fuzzy.start < match.end
+                    for match in matches
                 )
+            ]
+
+        return matches
+
+    def scan_edit(
+        self,
+        before: str,
+        after: str,
+        guild_id: int = None,
+        filter_config: dict = None
+    ) -> List[Match]:
+        """
+        Find bad words in an edited text by scanning only the changed
+        part, padded by the longest bad word and widened to whole words
+
+        Args:
+            `before` (str): Text before the edit
+            `after` (str): Text after the edit
+            `guild_id` (int, optional): Guild ID
+            `filter_config` (dict, optional): The guild's filter settings,
+                                              see `scan`
+
+        Returns:
+            List[Match]: Matches with spans into `after`
+        """
+
+        if before == after:
+            return []
+
+        prefix = _common_prefix(before, after)
+        suffix = _common_prefix(before[prefix:][::-1], after[prefix:][::-1])
+
+        # Removed text can join words too, so the window is never empty
+        pad = self.get_matcher(guild_id, filter_config).max_length
+        start = max(prefix - pad, 0)
+        end = min(len(after) - suffix + pad, len(after))
+
+        while start > 0 and not after[start - 1].isspace():
+            start -= 1
+        while end < len(after) and not after[end].isspace():
+            end += 1
+
+        return [
+            Match(match.start + start, match.end + start, match.word)
+            for match in self.scan(after[start:end], guild_id, filter_config)
+        ]
+
+    async def scan_stream(
+        self,
+        chunks: AsyncIterator[str],
+        guild_id: int = None,
+        filter_config: dict = None
+    ) -> str:
+        """
+        Check a long text that arrives in chunks, such as an attachment,
+        for bad words. Chunks are scanned in the worker pool with enough
+        of the previous chunk to catch words split between them, and
+        scanning stops at the first bad word.
+
+        Fuzzy matching is skipped, its caches are used by the event loop.
+
+        Args:
+            `chunks` (AsyncIterator[str]): The text in chunks
+            `guild_id` (int, optional): Guild ID
+            `filter_config` (dict, optional): The guild's word lists,
+                                              see `get_matcher`
+
+        Returns:
+            str: The first bad word found or ""
+        """
+
+        loop = asyncio.get_running_loop()
+        matcher = self.get_matcher(guild_id, filter_config)
+
+        # Enough of the previous chunk to complete a split bad word
+        pad = matcher.max_length
+        tail = ""
+
+        async for chunk in chunks:
+            text = tail + chunk
+
+            matches = await loop.run_in_executor(
+                self._executor, matcher.scan, text
+            )
+            if matches:
+                return matches[0].word
+
+            start = max(len(text) - pad, 0)
+            limit = max(len(text) - pad * 4, 0)
+            while start > limit and not text[start - 1].isspace():
+                start -= 1
+
+            tail = text[start:]
+
+        return ""
+
+    def close(self) -> None:
+        """
+        Stop the worker pool
+        """
 
-        # Log error if it occurs
-        except FileNotFoundError:
-            logging.error("Missing data/badwords.txt")
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
     def has_abusive_words(self, text: str) -> str:
         """
@@ -31,50 +588,201 @@ class Filter:
             str: The bad word which was used
         """
 
-        # Setup
-        for char in ["`", "*", ".", ",", ":", "?", "!"]:
-            text = text.replace(char, "")
+        matches = self.scan(text)
+        return matches[0].word if matches else ""
 
-        # Iterate over the words and check if
-        # any is present in _BADWORDS
-        for word in set(text.lower().split()):
-            if word in self._BADWORDS:
-                return word
-
-        return ""
-
-    def censor(self, text: str) -> str:
+    def censor(self, text: str, matches: List[Match] = None) -> str:
         """
-        Censor a piece of text
+        Censor a piece of text, leaving everything
+        but the bad words untouched
 
         Args:
             `text` (str): The text to censor
+            `matches` (List[Match], optional): Result of `scan(text)`,
+                                               scanned if not given
 
         Returns:
             str: The censored text.
         """
 
-        # Setup
-        for char in ["`", "*", ".", ",", ":", "?", "!"]:
-            text = text.replace(char, "")
+        if matches is None:
+            matches = self.scan(text)
+
+        # Merge overlapping matches, e.g. "ass" in "ass monkey"
+        spans = []
+        for start, end, _ in sorted(matches):
+            if spans and start < spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], end)
+            else:
+                spans.append([start, end])
+
+        # Rebuild the text in one pass
+        parts = []
+        position = 0
+        for start, end in spans:
+            parts.append(text[position:start])
+            parts.append(_mask(text[start:end]))
+            position = end
+
+        parts.append(text[position:])
+        return "".join(parts)
+
+
+def embed_text(embed: Embed) -> str:
+    """
+    Get the text of an embed
+
+    Args:
+        embed (Embed): Embed
+
+    Returns:
+        str: Title, description, fields, author and footer, one per line
+    """
+
+    texts = [embed.title, embed.description, embed.author.name]
+    for field in embed.fields:
+        texts += [field.name, field.value]
+    texts.append(embed.footer.text)
+
+    return "\n".join(str(text) for text in texts if text)
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """
+    Length of the common prefix of two strings, found by binary search
+    over slice comparisons so long texts are compared at C speed
+
+    Args:
+        a (str): String
+        b (str): String
+
+    Returns:
+        int: Number of leading characters both strings share
+    """
+
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
+
+
+def _mtime() -> Optional[int]:
+    """
+    Get the modification time of the word list file
+
+    Returns:
+        Optional[int]: mtime in nanoseconds or None if it's missing
+    """
+
+    try:
+        return os.stat(BADWORDS_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _compile() -> Optional[Tuple[Optional[int], Set[str], WordMatcher]]:
+    """
+    Read and compile the word list file
+
+    Returns:
+        Optional[Tuple[Optional[int], Set[str], WordMatcher]]:
+            File mtime, words and matcher or None if the file
+            couldn't be read
+    """
+
+    mtime = _mtime()
 
-        # Iterate over the words and check if
-        # any is present in _BADWORDS
-        for word in set(text.split()):
-            if word.lower() not in self._BADWORDS:
+    # Try to extract words from the file
+    try:
+        with open(BADWORDS_FILE) as FILE:
+            words = set(word.strip() for word in FILE.readlines())
+
+    # Log error if it occurs
+    except (OSError, UnicodeDecodeError) as e:
+        logging.error(f"Couldn't read {BADWORDS_FILE}: {e}")
+        return None
+
+    return mtime, words, WordMatcher(words)
+
+
+def _normalize(text: str) -> str:
+    """
+    Fold text, collapse everything between words into
+    single spaces and collapse repeated characters
+
+    Args:
+        text (str): Text
+
+    Returns:
+        str: Normalized text
+    """
+
+    return _REPEATS.sub(
+        r"\1", " ".join(text.translate(_FOLD_TABLE).split())
+    )
+
+
+def _positions(text: str) -> List[List[int]]:
+    """
+    Map every character of `_normalize(text)` back to `text`
+
+    Args:
+        text (str): Text
+
+    Returns:
+        List[List[int]]: [first index, last index, run length]
+                         in `text` of each normalized character
+    """
+
+    normalized: List[str] = []
+    positions: List[List[int]] = []
+    separator = None
+
+    for index, char in enumerate(text):
+        for folded in char.translate(_FOLD_TABLE):
+            if folded == " ":
+                if separator is None:
+                    separator = index
                 continue
 
-            if len(word) < 6:
-                stars = "\*" * (len(word) - 2)
-                text = text.replace(
-                    word,
-                    f"|| {word[0]}{stars}{word[-1]} ||"
-                )
-            else:
-                stars = "\*" * (len(word) - 4)
-                text = text.replace(
-                    word,
-                    f"|| {word[:2]}{stars}{word[-2:]} ||"
-                )
+            # Collapsed separator run, never at either end
+            if separator is not None and positions:
+                normalized.append(" ")
+                positions.append([separator, separator, 1])
+
+            separator = None
+
+            # Collapsed repeat
+            if normalized and normalized[-1] == folded:
+                positions[-1][1] = index
+                positions[-1][2] += 1
+                continue
+
+            normalized.append(folded)
+            positions.append([index, index, 1])
+
+    return positions
+
+
+def _mask(word: str) -> str:
+    """
+    Hide the middle of a word behind stars in a spoiler
+
+    Args:
+        word (str): Bad word
+
+    Returns:
+        str: e.g. `|| a\\*s ||`
+    """
+
+    keep = 1 if len(word) < 6 else 2
+    if len(word) <= keep * 2:
+        return f"|| {word} ||"
 
-        return text
+    stars = "\\*" * (len(word) - keep * 2)
+    return f"|| {word[:keep]}{stars}{word[-keep:]} ||"
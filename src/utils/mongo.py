@@ -0,0 +1,260 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase
+)
+from pymongo import (
+    ASCENDING,
+    DeleteMany,
+    InsertOne,
+    ReplaceOne,
+    ReturnDocument,
+    UpdateOne
+)
+from pymongo.errors import OperationFailure
+
+from .storage import (
+    GUILDS,
+    REACTION_ROLES,
+    ChangeCallback,
+    Storage,
+    reaction_rows
+)
+
+# Connection pool bounds for the Mongo client
+MAX_POOL_SIZE = 50
+MIN_POOL_SIZE = 5
+
+# Legacy reaction role map embedded in guild documents,
+# moved to its own collection by `migrate_reaction_messages`
+EXCLUDE_REACTION_MESSAGES = {"reaction_messages": 0}
+
+# Queries the bot runs on every cache miss and write.
+# Name => (collection, filter document)
+COMMON_QUERIES = {
+    "guild config lookup": (GUILDS, {"guild_id": 0}),
+    "reaction role lookup": (REACTION_ROLES, {"message_id": 0}),
+}
+
+
+class MongoStorage(Storage):
+    """
+    MongoDB storage backend using the async Motor driver
+    """
+
+    def __init__(self, host: str) -> None:
+        """
+        Create a pooled async client
+
+        Args:
+            host (str): MONGO_DB URI
+        """
+
+        self._client = AsyncIOMotorClient(
+            host=host,
+            maxPoolSize=MAX_POOL_SIZE,
+            minPoolSize=MIN_POOL_SIZE
+        )
+        self._db: AsyncIOMotorDatabase = self._client["reflect"]
+        self._guilds: AsyncIOMotorCollection = self._db[GUILDS]
+        self._reactions: AsyncIOMotorCollection = self._db[REACTION_ROLES]
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self._guilds.create_index(
+                [("guild_id", ASCENDING)],
+                name="guild_id",
+                unique=True
+            )
+        except OperationFailure as e:
+            logging.error(f"Couldn't create guild_id index: {e}")
+
+        await self._reactions.create_index(
+            [("message_id", ASCENDING)],
+            name="message_id"
+        )
+
+    async def explain_queries(self) -> Dict[str, List[str]]:
+        plans = {}
+        for name, (collection, query) in COMMON_QUERIES.items():
+            explanation = await self._db[collection].find(
+                query
+            ).limit(1).explain()
+            plans[name] = _plan_stages(
+                explanation["queryPlanner"]["winningPlan"]
+            )
+
+        return plans
+
+    async def load_guilds(self) -> List[dict]:
+        return await self._guilds.find(
+            projection=EXCLUDE_REACTION_MESSAGES
+        ).to_list(length=None)
+
+    async def load_reaction_roles(self) -> List[dict]:
+        return await self._reactions.find().to_list(length=None)
+
+    async def find_guild(
+        self,
+        guild_id: int,
+        fields: Iterable[str] = ()
+    ) -> Optional[dict]:
+        projection = {field: 1 for field in fields}
+
+        return await self._guilds.find_one(
+            {"guild_id": guild_id},
+            projection=projection or EXCLUDE_REACTION_MESSAGES
+        )
+
+    async def update_guild(
+        self,
+        guild_id: int,
+        set_fields: Dict[str, Any],
+        unset_fields: Iterable[str],
+        set_on_insert: Dict[str, Any],
+        upsert: bool,
+        inc_fields: Dict[str, int],
+        add_to_set: Dict[str, Any],
+        pull_fields: Dict[str, Any]
+    ) -> Optional[dict]:
+        update = {}
+        if set_fields:
+            update["$set"] = set_fields
+        if unset_fields:
+            update["$unset"] = {path: "" for path in unset_fields}
+        if set_on_insert:
+            update["$setOnInsert"] = set_on_insert
+        if inc_fields:
+            update["$inc"] = inc_fields
+        if add_to_set:
+            update["$addToSet"] = add_to_set
+        if pull_fields:
+            update["$pull"] = pull_fields
+
+        return await self._guilds.find_one_and_update(
+            {"guild_id": guild_id},
+            update,
+            projection=EXCLUDE_REACTION_MESSAGES,
+            upsert=upsert,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def bulk_update_guilds(
+        self,
+        updates: Dict[int, Dict[str, Any]]
+    ) -> None:
+        await self._guilds.bulk_write(
+            [
+                UpdateOne({"guild_id": guild_id}, {"$set": fields})
+                for guild_id, fields in updates.items()
+            ],
+            ordered=False
+        )
+
+    async def replace_reaction_roles(
+        self,
+        guild_id: int,
+        message_id: int,
+        reactions: Dict[str, int]
+    ) -> None:
+        await self._reactions.bulk_write(
+            [DeleteMany({"guild_id": guild_id, "message_id": message_id})] + [
+                InsertOne(row)
+                for row in reaction_rows(guild_id, message_id, reactions)
+            ]
+        )
+
+    async def delete_reaction_roles(
+        self,
+        guild_id: int,
+        message_id: int
+    ) -> int:
+        result = await self._reactions.delete_many(
+            {"guild_id": guild_id, "message_id": message_id}
+        )
+
+        return result.deleted_count
+
+    async def migrate_reaction_messages(self) -> int:
+        count = 0
+        async for guild_data in self._guilds.find(
+            {"reaction_messages": {"$exists": True}},
+            projection={"guild_id": 1, "reaction_messages": 1}
+        ):
+            requests = [
+                ReplaceOne({"_id": row["_id"]}, row, upsert=True)
+                for message_id, reactions in (
+                    guild_data["reaction_messages"].items()
+                )
+                for row in reaction_rows(
+                    guild_data["guild_id"], int(message_id), reactions
+                )
+            ]
+
+            if requests:
+                await self._reactions.bulk_write(requests)
+
+            # Drop the map only after its rows are written
+            await self._guilds.update_one(
+                {"_id": guild_data["_id"]},
+                {"$unset": {"reaction_messages": ""}}
+            )
+
+            count += len(guild_data["reaction_messages"])
+            logging.info(
+                f"Migrated reaction roles of {guild_data['guild_id']}"
+            )
+
+        return count
+
+    async def watch(self, callback: ChangeCallback) -> None:
+        pipeline = [{
+            "$match": {"ns.coll": {"$in": [GUILDS, REACTION_ROLES]}}
+        }]
+
+        try:
+            async with self._db.watch(
+                pipeline,
+                full_document="updateLookup"
+            ) as stream:
+                async for change in stream:
+                    callback(
+                        change["ns"]["coll"],
+                        change["documentKey"]["_id"],
+                        change.get("fullDocument")
+                    )
+
+        except OperationFailure:
+            logging.warning("Change streams unavailable")
+
+    async def close(self) -> None:
+        self._client.close()
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """
+    Collect the stage names of a query plan
+
+    Args:
+        plan (Any): Winning plan from explain()
+
+    Returns:
+        List[str]: Stage names, outermost first
+    """
+
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+
+    return stages
@@ -0,0 +1,376 @@
+import asyncio
+import json
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .storage import (
+    COLLSCAN,
+    Storage,
+    apply_update,
+    project,
+    reaction_rows
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    guild_id INTEGER PRIMARY KEY,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reaction_roles (
+    guild_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    emoji TEXT NOT NULL,
+    role_id INTEGER NOT NULL,
+    PRIMARY KEY (message_id, emoji)
+);
+"""
+
+# Queries the bot runs on every cache miss and write.
+# Name => SQL
+COMMON_QUERIES = {
+    "guild config lookup":
+        "SELECT config FROM guilds WHERE guild_id = 0",
+    "reaction role lookup":
+        "SELECT emoji, role_id FROM reaction_roles WHERE message_id = 0",
+}
+
+
+class SQLiteStorage(Storage):
+    """
+    Embedded SQLite storage backend.
+
+    Guild documents are stored as JSON. All queries run on a single
+    worker thread that owns the connection, so they never block the
+    event loop and never need locking.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the database file
+
+        Args:
+            path (str): Path of the database file
+        """
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="sqlite"
+        )
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """
+        Run a function on the worker thread
+
+        Args:
+            func (Callable): Function taking the connection first
+
+        Returns:
+            Any: Return value of the function
+        """
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, self._connection, *args
+        )
+
+    async def ensure_indexes(self) -> None:
+        await self._run(_ensure_schema)
+
+    async def explain_queries(self) -> Dict[str, List[str]]:
+        return await self._run(_explain_queries)
+
+    async def load_guilds(self) -> List[dict]:
+        return await self._run(_load_guilds)
+
+    async def load_reaction_roles(self) -> List[dict]:
+        return await self._run(_load_reaction_roles)
+
+    async def find_guild(
+        self,
+        guild_id: int,
+        fields: Iterable[str] = ()
+    ) -> Optional[dict]:
+        guild_data = await self._run(_find_guild, guild_id)
+
+        if guild_data and fields:
+            return project(guild_data, fields)
+
+        return guild_data
+
+    async def update_guild(
+        self,
+        guild_id: int,
+        set_fields: Dict[str, Any],
+        unset_fields: Iterable[str],
+        set_on_insert: Dict[str, Any],
+        upsert: bool,
+        inc_fields: Dict[str, int],
+        add_to_set: Dict[str, Any],
+        pull_fields: Dict[str, Any]
+    ) -> Optional[dict]:
+        return await self._run(
+            _update_guild,
+            guild_id,
+            set_fields,
+            list(unset_fields),
+            set_on_insert,
+            upsert,
+            inc_fields,
+            add_to_set,
+            pull_fields
+        )
+
+    async def bulk_update_guilds(
+        self,
+        updates: Dict[int, Dict[str, Any]]
+    ) -> None:
+        await self._run(_bulk_update_guilds, updates)
+
+    async def replace_reaction_roles(
+        self,
+        guild_id: int,
+        message_id: int,
+        reactions: Dict[str, int]
+    ) -> None:
+        await self._run(
+            _write_reaction_roles,
+            guild_id,
+            message_id,
+            reaction_rows(guild_id, message_id, reactions)
+        )
+
+    async def delete_reaction_roles(
+        self,
+        guild_id: int,
+        message_id: int
+    ) -> int:
+        return await self._run(_delete_reaction_roles, guild_id, message_id)
+
+    async def migrate_reaction_messages(self) -> int:
+        return await self._run(_migrate_reaction_messages)
+
+    async def close(self) -> None:
+        await self._run(sqlite3.Connection.close)
+        self._executor.shutdown()
+
+
+def _encode(value: Any) -> Any:
+    """
+    JSON encoder for values json doesn't support
+
+    Args:
+        value (Any): Value
+
+    Returns:
+        Any: JSON serializable value
+    """
+
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+
+    raise TypeError(f"Can't encode {type(value).__name__}")
+
+
+def _decode(value: dict) -> Any:
+    """
+    JSON object hook reversing `_encode`
+
+    Args:
+        value (dict): Decoded object
+
+    Returns:
+        Any: Original value
+    """
+
+    if len(value) == 1 and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+
+    return value
+
+
+def _dumps(guild_data: dict) -> str:
+    return json.dumps(guild_data, default=_encode)
+
+
+def _loads(config: str) -> dict:
+    return json.loads(config, object_hook=_decode)
+
+
+# The functions below run on the worker thread
+
+
+def _ensure_schema(connection: sqlite3.Connection) -> None:
+    with connection:
+        connection.executescript(SCHEMA)
+
+
+def _explain_queries(connection: sqlite3.Connection) -> Dict[str, List[str]]:
+    plans = {}
+    for name, query in COMMON_QUERIES.items():
+        details = [
+            row["detail"]
+            for row in connection.execute(f"EXPLAIN QUERY PLAN {query}")
+        ]
+        plans[name] = [
+            COLLSCAN if detail.startswith("SCAN") else detail
+            for detail in details
+        ]
+
+    return plans
+
+
+def _load_guilds(connection: sqlite3.Connection) -> List[dict]:
+    return [
+        _loads(row["config"])
+        for row in connection.execute("SELECT config FROM guilds")
+    ]
+
+
+def _load_reaction_roles(connection: sqlite3.Connection) -> List[dict]:
+    return [
+        dict(row)
+        for row in connection.execute("SELECT * FROM reaction_roles")
+    ]
+
+
+def _find_guild(
+    connection: sqlite3.Connection,
+    guild_id: int
+) -> Optional[dict]:
+    row = connection.execute(
+        "SELECT config FROM guilds WHERE guild_id = ?",
+        (guild_id,)
+    ).fetchone()
+
+    return _loads(row["config"]) if row else None
+
+
+def _update_guild(
+    connection: sqlite3.Connection,
+    guild_id: int,
+    set_fields: Dict[str, Any],
+    unset_fields: List[str],
+    set_on_insert: Dict[str, Any],
+    upsert: bool,
+    inc_fields: Dict[str, int],
+    add_to_set: Dict[str, Any],
+    pull_fields: Dict[str, Any]
+) -> Optional[dict]:
+    with connection:
+        # Take the write lock before reading
+        connection.execute("BEGIN IMMEDIATE")
+        guild_data = _find_guild(connection, guild_id)
+
+        if not guild_data:
+            if not upsert:
+                return None
+
+            guild_data = {"guild_id": guild_id}
+            apply_update(guild_data, set_on_insert, ())
+
+        apply_update(
+            guild_data,
+            set_fields,
+            unset_fields,
+            inc_fields,
+            add_to_set,
+            pull_fields
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO guilds (guild_id, config) VALUES (?, ?)",
+            (guild_id, _dumps(guild_data))
+        )
+
+    return guild_data
+
+
+def _bulk_update_guilds(
+    connection: sqlite3.Connection,
+    updates: Dict[int, Dict[str, Any]]
+) -> None:
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+
+        for guild_id, fields in updates.items():
+            guild_data = _find_guild(connection, guild_id)
+            if not guild_data:
+                continue
+
+            apply_update(guild_data, fields, ())
+            connection.execute(
+                "UPDATE guilds SET config = ? WHERE guild_id = ?",
+                (_dumps(guild_data), guild_id)
+            )
+
+
+def _write_reaction_roles(
+    connection: sqlite3.Connection,
+    guild_id: int,
+    message_id: int,
+    rows: List[dict]
+) -> None:
+    with connection:
+        _replace_reaction_roles(connection, guild_id, message_id, rows)
+
+
+def _delete_reaction_roles(
+    connection: sqlite3.Connection,
+    guild_id: int,
+    message_id: int
+) -> int:
+    with connection:
+        return connection.execute(
+            "DELETE FROM reaction_roles WHERE guild_id = ? AND message_id = ?",
+            (guild_id, message_id)
+        ).rowcount
+
+
+def _replace_reaction_roles(
+    connection: sqlite3.Connection,
+    guild_id: int,
+    message_id: int,
+    rows: List[dict]
+) -> None:
+    # Caller commits
+    connection.execute(
+        "DELETE FROM reaction_roles WHERE guild_id = ? AND message_id = ?",
+        (guild_id, message_id)
+    )
+    connection.executemany(
+        "INSERT INTO reaction_roles (guild_id, message_id, emoji, role_id)"
+        " VALUES (:guild_id, :message_id, :emoji, :role_id)",
+        rows
+    )
+
+
+def _migrate_reaction_messages(connection: sqlite3.Connection) -> int:
+    count = 0
+    for guild_data in _load_guilds(connection):
+        reaction_messages = guild_data.pop("reaction_messages", None)
+        if reaction_messages is None:
+            continue
+
+        with connection:
+            for message_id, reactions in reaction_messages.items():
+                _replace_reaction_roles(
+                    connection,
+                    guild_data["guild_id"],
+                    int(message_id),
+                    reaction_rows(
+                        guild_data["guild_id"], int(message_id), reactions
+                    )
+                )
+
+            connection.execute(
+                "UPDATE guilds SET config = ? WHERE guild_id = ?",
+                (_dumps(guild_data), guild_data["guild_id"])
+            )
+
+        count += len(reaction_messages)
+        logging.info(f"Migrated reaction roles of {guild_data['guild_id']}")
+
+    return count
@@ -0,0 +1,321 @@
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional
+)
+
+# Collection (table) names
+GUILDS = "guilds"
+REACTION_ROLES = "reaction_roles"
+
+# Stage reported for queries that scan a whole collection
+COLLSCAN = "COLLSCAN"
+
+# Called with (collection, document key, document or None if deleted)
+ChangeCallback = Callable[[str, Any, Optional[dict]], None]
+
+
+class Storage(ABC):
+    """
+    Interface of a guild data storage backend.
+
+    Guild documents look like
+    {"guild_id", "channel_ids": {...}, "role_ids": {...}, ...}
+    and reaction roles are stored one row per (message, emoji):
+    {"guild_id", "message_id", "emoji", "role_id"}
+    """
+
+    @abstractmethod
+    async def ensure_indexes(self) -> None:
+        """
+        Create the tables and indexes the bot's queries rely on
+        """
+
+    @abstractmethod
+    async def explain_queries(self) -> Dict[str, List[str]]:
+        """
+        Get the query plans of the bot's common queries
+
+        Returns:
+            Dict[str, List[str]]: Query name => plan stages, with
+                                  COLLSCAN for full scans
+        """
+
+    @abstractmethod
+    async def load_guilds(self) -> List[dict]:
+        """
+        Get every guild document
+
+        Returns:
+            List[dict]: Guild documents
+        """
+
+    @abstractmethod
+    async def load_reaction_roles(self) -> List[dict]:
+        """
+        Get every reaction role row
+
+        Returns:
+            List[dict]: Reaction role rows
+        """
+
+    @abstractmethod
+    async def find_guild(
+        self,
+        guild_id: int,
+        fields: Iterable[str] = ()
+    ) -> Optional[dict]:
+        """
+        Get a guild document
+
+        Args:
+            guild_id (int): Guild ID
+            fields (Iterable[str], optional): Dotted paths to project.
+                                              Defaults to all.
+
+        Returns:
+            Optional[dict]: The document or None if it doesn't exist
+        """
+
+    @abstractmethod
+    async def update_guild(
+        self,
+        guild_id: int,
+        set_fields: Dict[str, Any],
+        unset_fields: Iterable[str],
+        set_on_insert: Dict[str, Any],
+        upsert: bool,
+        inc_fields: Dict[str, int],
+        add_to_set: Dict[str, Any],
+        pull_fields: Dict[str, Any]
+    ) -> Optional[dict]:
+        """
+        Atomically update a guild document
+
+        Args:
+            guild_id (int): Guild ID
+            set_fields (dict): Path => value to set
+            unset_fields (Iterable[str]): Paths to remove
+            set_on_insert (dict): Path => value to set only
+                                  when the document is created
+            upsert (bool): Create the document if it doesn't exist
+            inc_fields (dict): Path => number to add
+            add_to_set (dict): Path of a list => value to add
+                               unless the list has it
+            pull_fields (dict): Path of a list => value to remove
+
+        Returns:
+            Optional[dict]: The updated document or None if it doesn't exist
+        """
+
+    @abstractmethod
+    async def bulk_update_guilds(
+        self,
+        updates: Dict[int, Dict[str, Any]]
+    ) -> None:
+        """
+        Set fields on many existing guild documents in one batch
+
+        Args:
+            updates (dict): Guild ID => {path => value to set}
+        """
+
+    @abstractmethod
+    async def replace_reaction_roles(
+        self,
+        guild_id: int,
+        message_id: int,
+        reactions: Dict[str, int]
+    ) -> None:
+        """
+        Replace the reaction role rows of a message
+
+        Args:
+            guild_id (int): Guild ID
+            message_id (int): Message ID
+            reactions (dict): Emoji name => role ID
+        """
+
+    @abstractmethod
+    async def delete_reaction_roles(
+        self,
+        guild_id: int,
+        message_id: int
+    ) -> int:
+        """
+        Delete the reaction role rows of a message of a guild
+
+        Args:
+            guild_id (int): Guild ID
+            message_id (int): Message ID
+
+        Returns:
+            int: Number of deleted rows, 0 if the message has no
+                 reaction roles in the guild
+        """
+
+    @abstractmethod
+    async def migrate_reaction_messages(self) -> int:
+        """
+        Move reaction roles embedded in guild documents
+        to their own rows
+
+        Returns:
+            int: Number of migrated messages
+        """
+
+    async def watch(self, callback: ChangeCallback) -> None:
+        """
+        Report changes made by other processes until the backend stops
+        supporting it. Backends without change notification return
+        immediately.
+
+        Args:
+            callback (ChangeCallback): Called for every change
+        """
+
+    async def close(self) -> None:
+        """
+        Release the backend's connections
+        """
+
+
+def reaction_rows(
+    guild_id: int,
+    message_id: int,
+    reactions: Dict[str, int]
+) -> List[dict]:
+    """
+    Create reaction role rows for a message
+
+    Args:
+        guild_id (int): Guild ID
+        message_id (int): Message ID
+        reactions (dict): Emoji name => role ID
+
+    Returns:
+        List[dict]: One row per emoji
+    """
+
+    return [
+        {
+            "_id": {"message_id": message_id, "emoji": emoji},
+            "guild_id": guild_id,
+            "message_id": message_id,
+            "emoji": emoji,
+            "role_id": role_id
+        }
+        for emoji, role_id in reactions.items()
+    ]
+
+
+def project(guild_data: dict, fields: Iterable[str]) -> dict:
+    """
+    Copy only the given dotted paths out of a document
+
+    Args:
+        guild_data (dict): Document
+        fields (Iterable[str]): Paths to copy
+
+    Returns:
+        dict: Projected document
+    """
+
+    projected = {}
+    for field in fields:
+        *parents, key = field.split(".")
+
+        source, target = guild_data, projected
+        for parent in parents:
+            source = source.get(parent)
+            if not isinstance(source, dict):
+                break
+
+            target = target.setdefault(parent, {})
+
+        else:
+            if key in source:
+                target[key] = source[key]
+
+    return projected
+
+
+def apply_update(
+    guild_data: dict,
+    set_fields: Dict[str, Any],
+    unset_fields: Iterable[str],
+    inc_fields: Optional[Dict[str, int]] = None,
+    add_to_set: Optional[Dict[str, Any]] = None,
+    pull_fields: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Apply dotted-path $set, $unset, $inc, $addToSet and $pull
+    semantics to a document in place
+
+    Args:
+        guild_data (dict): Document
+        set_fields (dict): Path => value to set
+        unset_fields (Iterable[str]): Paths to remove
+        inc_fields (dict, optional): Path => number to add
+        add_to_set (dict, optional): Path of a list => value to add
+                                     unless the list has it
+        pull_fields (dict, optional): Path of a list => value to remove
+    """
+
+    for field, value in (inc_fields or {}).items():
+        *parents, key = field.split(".")
+
+        target = guild_data
+        for parent in parents:
+            target = target.setdefault(parent, {})
+
+        target[key] = target.get(key, 0) + value
+
+    for field, value in (add_to_set or {}).items():
+        *parents, key = field.split(".")
+
+        target = guild_data
+        for parent in parents:
+            target = target.setdefault(parent, {})
+
+        values = target.setdefault(key, [])
+        if value not in values:
+            values.append(value)
+
+    for field, value in (pull_fields or {}).items():
+        *parents, key = field.split(".")
+
+        target = guild_data
+        for parent in parents:
+            target = target.get(parent)
+            if not isinstance(target, dict):
+                break
+
+        else:
+            if isinstance(target.get(key), list):
+                target[key] = [item for item in target[key] if item != value]
+
+    for field, value in set_fields.items():
+        *parents, key = field.split(".")
+
+        target = guild_data
+        for parent in parents:
+            target = target.setdefault(parent, {})
+
+        target[key] = value
+
+    for field in unset_fields:
+        *parents, key = field.split(".")
+
+        target = guild_data
+        for parent in parents:
+            target = target.get(parent)
+            if not isinstance(target, dict):
+                break
+
+        else:
+            target.pop(key, None)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from .storage import Storage
+
+
+class WriteBuffer:
+    """
+    Coalesce high-frequency guild document writes and
+    flush them to storage in bulk
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        flush_interval: float,
+        max_pending: int
+    ) -> None:
+        """
+        Initialize
+
+        Args:
+            storage (Storage): Storage backend
+            flush_interval (float): Max seconds a write stays buffered
+            max_pending (int): Number of buffered guilds that triggers
+                               an immediate flush
+        """
+
+        self._storage = storage
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+
+        # guild_id => {path => value}, later writes win
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._closed = False
+
+        # Running flush tasks, the timer included
+        self._flushes: Set[asyncio.Task] = set()
+
+    def set(self, guild_id: int, fields: Dict[str, Any]) -> None:
+        """
+        Buffer a $set of dotted paths on a guild document
+
+        Args:
+            guild_id (int): Guild ID
+            fields (dict): Path => value to set
+        """
+
+        self._pending.setdefault(guild_id, {}).update(fields)
+
+        if len(self._pending) >= self._max_pending:
+            self._track(asyncio.create_task(self.flush()))
+
+        else:
+            self._start_timer()
+
+    def pending(self, guild_id: int) -> Dict[str, Any]:
+        """
+        Get the buffered writes of a guild
+
+        Args:
+            guild_id (int): Guild ID
+
+        Returns:
+            Dict[str, Any]: Path => value not yet written
+        """
+
+        return self._pending.get(guild_id, {})
+
+    def _track(self, task: asyncio.Task) -> asyncio.Task:
+        """
+        Keep a flush task until it's done, so close can wait for it
+
+        Args:
+            task (asyncio.Task): Flush task
+
+        Returns:
+            asyncio.Task: The same task
+        """
+
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+        return task
+
+    def _start_timer(self) -> None:
+        """
+        Flush after the flush interval unless a flush is scheduled
+        or the buffer is closed
+        """
+
+        if not self._timer and not self._closed:
+            self._timer = self._track(
+                asyncio.create_task(self._flush_later())
+            )
+
+    async def _flush_later(self) -> None:
+        """
+        Flush once the flush interval has passed
+        """
+
+        await asyncio.sleep(self._flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write every buffered update in one bulk write. Updates that
+        fail are kept and retried on the next flush.
+        """
+
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        try:
+            await self._storage.bulk_update_guilds(pending)
+
+        except Exception as e:
+            logging.error(f"Couldn't flush {len(pending)} write(s): {e}")
+
+            # Keep values buffered while flushing
+            for guild_id, fields in pending.items():
+                self._pending[guild_id] = {
+                    **fields, **self._pending.get(guild_id, {})
+                }
+
+            self._start_timer()
+
+    async def close(self) -> None:
+        """
+        Cancel the flush timer, wait for the running flushes
+        and flush everything buffered
+        """
+
+        self._closed = True
+
+        # The timer is still sleeping if it's set
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        # Writes of failed flushes are buffered again
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+        await self.flush()